@@ -1,9 +1,13 @@
 import streamlit as st
-import base64
 import os
 from supabase import create_client, Client
 import streamlit.components.v1 as components
 import bcrypt
+import io
+from report_cache import ReportCache
+from report_html import export_reports_zip
+from analysis import get_translation_memory
+from static_assets import asset_url
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -30,13 +34,10 @@ def load_css(file_name):
 # --- Function to set background image ---
 def set_page_background(png_file):
     try:
-        with open(png_file, "rb") as f:
-            data = f.read()
-        bin_str = base64.b64encode(data).decode()
         page_bg_img = f'''
         <style>
         .stApp {{
-            background-image: url("data:image/png;base64,{bin_str}");
+            background-image: url("{asset_url(png_file)}");
             background-size: cover;
             background-position: center;
         }}
@@ -129,6 +130,31 @@ if st.session_state.get('logged_in'):
                                 st.success(f"User '{new_username}' created successfully!")
                         else:
                             st.warning("Please provide both a username and a password.")
+        with st.expander("🗂️ Admin: Report Cache"):
+            report_cache = ReportCache()
+            cache_summary = report_cache.summary()
+            st.write(f"{cache_summary['entries']} cached reports ({cache_summary['bytes'] / 1024:.1f} KB).")
+            cached_district = st.selectbox("District", ["All districts"] + cache_summary['districts'], key="cache_district")
+            if st.button("Invalidate Cached Reports"):
+                if cached_district == "All districts":
+                    removed = report_cache.invalidate()
+                else:
+                    removed = report_cache.invalidate(district=cached_district)
+                st.success(f"Removed {removed} cached report(s).")
+            # Kannada segment translations learned from the LLM are reused by every later report
+            translation_memory = get_translation_memory()
+            st.write(f"{sum(translation_memory.summary().values())} learned Kannada segment translations.")
+            if st.button("Clear Learned Translations"):
+                removed = translation_memory.invalidate()
+                st.success(f"Removed {removed} learned translation(s).")
+            if cache_summary['entries']:
+                def build_reports_zip():
+                    archive = io.BytesIO()
+                    export_reports_zip(report_cache, archive)
+                    return archive.getvalue()
+                # A callable is only run on click, so reruns do not render and compress every report
+                st.download_button("📦 Download Cached Reports (ZIP)", data=build_reports_zip,
+                                   file_name="feasibility_reports.zip", mime="application/zip")
     else:
         st.info("You can view information about the **India Semiconductor Mission**.")
 else:
@@ -138,18 +164,12 @@ else:
     try:
         header_cols = st.columns([1, 2, 1])
         with header_cols[0]:
-            with open("images/chip_left.glb", "rb") as f:
-                left_model_data = f.read()
-            left_model_b64 = base64.b64encode(left_model_data).decode()
-            left_model_src = f"data:model/gltf-binary;base64,{left_model_b64}"
+            left_model_src = asset_url("images/chip_left.glb")
             components.html(f"""<script type="module" src="https://ajax.googleapis.com/ajax/libs/model-viewer/3.5.0/model-viewer.min.js"></script><model-viewer class="model-viewer" src="{left_model_src}" alt="A 3D model" auto-rotate camera-controls shadow-intensity="1"></model-viewer>""", height=160)
         with header_cols[1]:
             st.markdown("""<div class="title-block"><h1 class="main-title">SiliCoreX</h1><p class="subtitle">AI-driven hybrid model for Semiconductor Analytics</p></div>""", unsafe_allow_html=True)
         with header_cols[2]:
-            with open("images/chip_right.glb", "rb") as f:
-                right_model_data = f.read()
-            right_model_b64 = base64.b64encode(right_model_data).decode()
-            right_model_src = f"data:model/gltf-binary;base64,{right_model_b64}"
+            right_model_src = asset_url("images/chip_right.glb")
             components.html(f"""<script type="module" src="https://ajax.googleapis.com/ajax/libs/model-viewer/3.5.0/model-viewer.min.js"></script><model-viewer class="model-viewer" src="{right_model_src}" alt="A 3D model" auto-rotate camera-controls shadow-intensity="1"></model-viewer>""", height=160)
     except FileNotFoundError:
         st.error("Header 3D model files not found.")
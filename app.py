@@ -1,19 +1,13 @@
 import streamlit as st
 # The import for the analysis function name has changed
-from analysis import load_data, get_llm_analysis_and_stream, create_html_report 
+from analysis import load_district_features, get_llm_analysis_and_stream, create_html_report 
 from translations import LANG_STRINGS, DISTRICT_MAP_EN_KN, DISTRICT_MAP_KN_EN
-import base64
 import os
-
-# ... (get_base64_of_bin_file and set_page_background functions remain the same) ...
-def get_base64_of_bin_file(bin_file):
-    with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+from static_assets import asset_url
 
 def set_page_background(png_file):
-    bin_str = get_base64_of_bin_file(png_file)
-    page_bg_img = f'''<style>.stApp {{ background-image: url("data:image/png;base64,{bin_str}"); background-size: cover; }}</style>'''
+    # asset_url serves the image statically (or as a data URI encoded once per process)
+    page_bg_img = f'''<style>.stApp {{ background-image: url("{asset_url(png_file)}"); background-size: cover; }}</style>'''
     st.markdown(page_bg_img, unsafe_allow_html=True)
 
 
@@ -40,13 +34,13 @@ st.session_state['lang'] = 'en' if selected_lang_display == 'English' else 'kn'
 st.sidebar.markdown("---")
 
 # Data loading is now cached
-rainfall_data, boilers_data, roads_data = load_data()
+district_features = load_district_features()
 
-if all(df is not None for df in [rainfall_data, boilers_data, roads_data]):
+if district_features is not None:
     st.sidebar.header(LANG_STRINGS['site_selection_header'][lang])
     st.sidebar.info(LANG_STRINGS['site_selection_info'][lang])
 
-    available_districts_en = [dist for dist in sorted(rainfall_data['District'].unique()) if dist in DISTRICT_MAP_EN_KN]
+    available_districts_en = [dist for dist in district_features.dropna(subset=['annual_rainfall_mm'])['district'] if dist in DISTRICT_MAP_EN_KN]
     
     if lang == 'kn':
         display_districts = [DISTRICT_MAP_EN_KN[dist] for dist in available_districts_en]
@@ -67,11 +61,8 @@ if all(df is not None for df in [rainfall_data, boilers_data, roads_data]):
         def stream_handler():
             full_report_text = ""
             placeholder = st.empty()
-            for chunk in get_llm_analysis_and_stream(district_en, rainfall_data, boilers_data, roads_data, language=lang):
-                if chunk == "<STOP_AND_CLEAR>":
-                    full_report_text = "" # Reset for translation
-                else:
-                    full_report_text += chunk
+            for chunk in get_llm_analysis_and_stream(district_en, district_features, language=lang):
+                full_report_text += chunk
                 placeholder.markdown(full_report_text + " ▌") # Add a blinking cursor effect
             placeholder.markdown(full_report_text) # Show final report
             return full_report_text
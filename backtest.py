@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from model_bundle import data_fingerprint, latest_bundle_path, load_bundle
+from training_data import DATA_PATH, iter_feature_chunks
+
+# --- Rolling-Origin Backtest ---
+# Replays the fab history from a series of forecast origins: every method sees only the rows
+# before an origin and forecasts the next days, which are then compared with what actually
+# happened. The LSTM bundle is benchmarked against cheap baselines, and each method's
+# compute time and peak memory are recorded next to its errors. The JSON report is written
+# per bundle version so accuracy and speed can be tracked as the model changes.
+BACKTEST_DIR = 'model/backtests'
+HORIZONS = [1, 7, 30, 90, 180]
+ORIGIN_STRIDE = 30
+SES_ALPHA = 0.3
+METHODS = ['lstm', 'naive', 'drift', 'exp_smoothing']
+
+
+# --- Forecast Methods ---
+# Each returns [origins, max_horizon, features] in real units.
+def naive_forecast(values, origins, max_horizon):
+    """Repeats the last observed value."""
+    return np.repeat(values[origins - 1][:, np.newaxis], max_horizon, axis=1)
+
+
+def drift_forecast(values, origins, max_horizon):
+    """Extends the straight line from the first to the last observed value."""
+    slope = (values[origins - 1] - values[0]) / (origins - 1)[:, np.newaxis]
+    steps = np.arange(1, max_horizon + 1)[np.newaxis, :, np.newaxis]
+    return values[origins - 1][:, np.newaxis] + slope[:, np.newaxis] * steps
+
+
+def exp_smoothing_forecast(values, origins, max_horizon, alpha=SES_ALPHA):
+    """Simple exponential smoothing; the level series is computed once and shared by all origins."""
+    level = np.empty_like(values)
+    level[0] = values[0]
+    for t in range(1, origins.max()):
+        level[t] = alpha * values[t] + (1 - alpha) * level[t - 1]
+    return np.repeat(level[origins - 1][:, np.newaxis], max_horizon, axis=1)
+
+
+def lstm_forecast(values, origins, max_horizon, bundle_path=None):
+    """Batched rollout of the model bundle from every origin at once."""
+    bundle = load_bundle(bundle_path)
+    windows = sliding_window_view(values, bundle.sequence_length, axis=0).transpose(0, 2, 1)
+    seeds = bundle.scale(windows[origins - bundle.sequence_length])
+    return bundle.inverse_scale(bundle.forecaster.rollout(seeds, max_horizon))
+
+
+def _run_method(method, values, origins, max_horizon, bundle_path):
+    """Runs one method on a batch of origins, measuring its time and peak traced memory."""
+    forecast = {
+        'lstm': lambda: lstm_forecast(values, origins, max_horizon, bundle_path),
+        'naive': lambda: naive_forecast(values, origins, max_horizon),
+        'drift': lambda: drift_forecast(values, origins, max_horizon),
+        'exp_smoothing': lambda: exp_smoothing_forecast(values, origins, max_horizon),
+    }[method]
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        predictions = forecast()
+        seconds = time.perf_counter() - start
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return predictions, seconds, peak_bytes
+
+
+# --- Scoring ---
+def forecast_errors(predictions, actual, horizons, feature_columns):
+    """MAE, RMSE and MAPE (%) of the day-`h` prediction across origins, per feature and horizon."""
+    metrics = {}
+    for i, col in enumerate(feature_columns):
+        errors = predictions[:, :, i] - actual[:, :, i]
+        metrics[col] = {
+            'mae': {h: float(np.abs(errors[:, h - 1]).mean()) for h in horizons},
+            'rmse': {h: float(np.sqrt((errors[:, h - 1] ** 2).mean())) for h in horizons},
+            'mape': {h: float((np.abs(errors[:, h - 1]) / np.abs(actual[:, h - 1, i])).mean() * 100) for h in horizons},
+        }
+    return metrics
+
+
+def run_backtest(values, bundle_path, horizons=HORIZONS, first_origin=None, stride=ORIGIN_STRIDE, methods=METHODS, workers=None):
+    """
+    Backtests every method from origins `first_origin`, `first_origin + stride`, ... and
+    returns the report dict. The origins are split into one batch per worker, so each
+    method's batches run in parallel.
+
+    By default the origins start after the rows the bundle was trained on; a bundle trained
+    on the whole history is backtested on its second half and the report is marked in-sample.
+    """
+    bundle = load_bundle(bundle_path)
+    max_horizon = max(horizons)
+    training_rows = bundle.metadata['training_rows']
+    if first_origin is None:
+        first_origin = training_rows if training_rows <= len(values) - max_horizon else len(values) // 2
+    first_origin = max(first_origin, bundle.sequence_length, 2)
+    origins = np.arange(first_origin, len(values) - max_horizon + 1, stride)
+    if len(origins) == 0:
+        raise ValueError(f"Not enough data after row {first_origin} for a {max_horizon}-day horizon.")
+    actual = sliding_window_view(values, max_horizon, axis=0).transpose(0, 2, 1)[origins]
+
+    workers = workers or os.cpu_count() or 1
+    batches = [batch for batch in np.array_split(origins, workers) if len(batch)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {method: [pool.submit(_run_method, method, values, batch, max_horizon, bundle.path) for batch in batches] for method in methods}
+        results = {method: [future.result() for future in method_futures] for method, method_futures in futures.items()}
+    wall_seconds = time.perf_counter() - start
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'bundle': {'path': bundle.path, 'version': bundle.version, 'sha256': bundle.sha256, 'training_rows': training_rows},
+        'data': {'rows': len(values), 'sha256': data_fingerprint(values)},
+        'origins': {'first': int(origins[0]), 'last': int(origins[-1]), 'stride': stride, 'count': len(origins),
+                    'in_sample': bool(origins[0] < training_rows)},
+        'horizons': list(horizons),
+        'workers': workers,
+        'wall_seconds': wall_seconds,
+        'methods': {},
+    }
+    for method, method_results in results.items():
+        predictions = np.concatenate([result[0] for result in method_results])
+        compute_seconds = sum(result[1] for result in method_results)
+        report['methods'][method] = {
+            'compute_seconds': compute_seconds,
+            'seconds_per_origin': compute_seconds / len(origins),
+            'peak_memory_bytes': max(result[2] for result in method_results),
+            'metrics': forecast_errors(predictions, actual, horizons, bundle.feature_columns),
+        }
+    return report
+
+
+def summary_table(report, metric='mape'):
+    """One row per method and feature, one column per horizon."""
+    rows = []
+    for method, result in report['methods'].items():
+        for col, metrics in result['metrics'].items():
+            rows.append({'method': method, 'feature': col, **{f'h={h}': value for h, value in metrics[metric].items()}})
+    return pd.DataFrame(rows).sort_values(['feature', 'method']).reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the LSTM bundle against naive baselines.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--bundle', default=None, help="Bundle to backtest (default: latest in model/bundles).")
+    parser.add_argument('--horizons', type=int, nargs='+', default=HORIZONS, help="Forecast days to score.")
+    parser.add_argument('--first-origin', type=int, default=None, help="First origin row (default: first row after the training data).")
+    parser.add_argument('--stride', type=int, default=ORIGIN_STRIDE, help="Days between origins.")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help="Report path (default: model/backtests/<bundle name>.json).")
+    args = parser.parse_args()
+
+    bundle_path = args.bundle or latest_bundle_path()
+    feature_columns = load_bundle(bundle_path).feature_columns
+    values = np.concatenate(list(iter_feature_chunks(args.data, feature_columns)))
+    report = run_backtest(values, bundle_path, sorted(args.horizons), args.first_origin, args.stride, workers=args.workers)
+    report['data']['path'] = args.data
+
+    output = args.output or os.path.join(BACKTEST_DIR, os.path.basename(bundle_path).replace('.npz', '.json'))
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    origins = report['origins']
+    print(f"Backtested bundle v{report['bundle']['version']} from {origins['count']} origins "
+          f"(rows {origins['first']}-{origins['last']}, every {origins['stride']} days) in {report['wall_seconds']:.1f}s.")
+    if origins['in_sample']:
+        print("Warning: these origins overlap the bundle's training data, so the LSTM errors are in-sample.")
+    print("\nMAPE (%) by forecast day:")
+    print(summary_table(report).to_string(index=False, float_format='{:.2f}'.format))
+    print("\nCost per method:")
+    for method, result in report['methods'].items():
+        print(f"  {method:<14} {result['seconds_per_origin'] * 1000:8.2f} ms/origin   peak {result['peak_memory_bytes'] / 1e6:7.2f} MB")
+    print(f"\nReport written to '{output}'")
@@ -0,0 +1,97 @@
+import calendar
+import re
+import numpy as np
+import pandas as pd
+from translations import DISTRICT_MAP_EN_KN
+
+# --- District Feature Store ---
+# The rainfall, boiler and road sources spell district names differently (Ballari/Bellary,
+# Belagavi/Belgavi, Kalaburagi/Kalburgi, ...). Every name is resolved to one canonical key, and
+# all KPIs are precomputed into a single wide table indexed by that key, so looking up a
+# district is one index access instead of a groupby and three full-table scans.
+
+# Canonical names are the English names the UI shows (DISTRICT_MAP_EN_KN); other spellings
+# found in the sources, or in common use, resolve to them.
+DISTRICT_ALIASES = {
+    'Bangalore Rural': ['Bengaluru Rural'],
+    'Bangalore Urban': ['Bengaluru Urban', 'Bangalore', 'Bengaluru'],
+    'Belagavi': ['Belgavi', 'Belgaum'],
+    'Bellary': ['Ballari'],
+    'Chamarajanagar': ['Chamarajanagara'],
+    'Chikkaballapur': ['Chikkaballapura'],
+    'Chikkamagaluru': ['Chikkamagalur', 'Chikmagalur'],
+    'Davanagere': ['Davangere'],
+    'Kalaburagi': ['Kalburgi', 'Gulbarga'],
+    'Kodagu': ['Madikeri', 'Coorg'],
+    'Mysuru': ['Mysore'],
+    'Shivamogga': ['Shimogga', 'Shimoga'],
+    'Tumakuru': ['Tumkur'],
+    'Vijayapura': ['Vijayapur', 'Bijapura', 'Bijapur'],
+}
+MONTH_COLUMNS = [f'rainfall_{calendar.month_abbr[month].lower()}_mm' for month in range(1, 13)]
+
+
+def _normalize(name):
+    return re.sub(r'[^a-z0-9]', '', str(name).lower())
+
+
+_CANONICAL_NAMES = {_normalize(name): name for name in DISTRICT_MAP_EN_KN}
+_CANONICAL_NAMES.update({_normalize(alias): name for name, aliases in DISTRICT_ALIASES.items() for alias in aliases})
+
+
+def canonical_district(name):
+    """Canonical display name for any known spelling; unknown districts keep their own name."""
+    return _CANONICAL_NAMES.get(_normalize(name), str(name).strip())
+
+
+def district_key(name):
+    """Index key of the feature store for any spelling of a district name."""
+    return _normalize(canonical_district(name))
+
+
+def _keys(districts):
+    # Resolved once per distinct name rather than once per row
+    districts = districts.astype('category')
+    return districts.map({name: district_key(name) for name in districts.cat.categories}).astype(str)
+
+
+def build_district_features(rainfall_summary, boilers_data, roads_data):
+    """
+    One row per district, indexed by district_key: the rainfall KPIs of the rainfall store
+    (rainfall_store.district_summary), boiler counts and road lengths. Missing KPIs are NaN.
+    """
+    boilers = pd.DataFrame({
+        'key': _keys(boilers_data['DISTRICT']),
+        'working_boilers': boilers_data['NO.OF WORKING BOILERS'].to_numpy(),
+        'working_spl': boilers_data['NO.OF WORKING SPL'].to_numpy(),
+        'economisers': boilers_data['NO. OF ECONOMISERS'].to_numpy(),
+    }).groupby('key').sum()
+    roads = pd.DataFrame({
+        'key': _keys(roads_data['District']),
+        'state_highways_km': roads_data['State Highways in Kms'].to_numpy(),
+        'major_district_roads_km': roads_data['Major District Roads in Kms'].to_numpy(),
+        'total_road_km': roads_data['Total in Kms'].to_numpy(),
+    }).groupby('key').sum()
+
+    features = pd.concat([rainfall_summary.drop(columns='district'), boilers, roads], axis=1)
+    features.index.name = 'district_key'
+    names = pd.concat([rainfall_summary['district'], boilers_data['DISTRICT'], roads_data['District']]).astype(str).unique()
+    display_names = {district_key(name): canonical_district(name) for name in names}
+    features.insert(0, 'district', features.index.map(display_names))
+    return features.sort_values('district')
+
+
+def lookup_district(features, name):
+    """The feature row of a district (any spelling) as a dict, or None if it is unknown."""
+    key = district_key(name)
+    if key not in features.index:
+        return None
+    return features.loc[key].to_dict()
+
+
+def kpi_value(row, column, digits=2):
+    """A KPI for the report prompt, or "Not Available" when the district or value is missing."""
+    if row is None or pd.isna(row.get(column, np.nan)):
+        return "Not Available"
+    value = float(row[column])
+    return int(value) if value.is_integer() else round(value, digits)
@@ -0,0 +1,63 @@
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+from tensorflow.keras.models import load_model
+from forecasting import FEATURE_COLUMNS, SEQUENCE_LENGTH, DAYS_PER_YEAR, MODEL_H5_PATH, one_step_residual_std
+from keras_rollout import KerasRolloutEngine
+from lstm_numpy import extract_keras_weights, NumpyLSTMForecaster
+from model_bundle import save_bundle, load_bundle, data_fingerprint
+
+# Packages a trained Keras model into a versioned model bundle for the forecasting page. The
+# bundle is first written to a scratch directory and its NumPy forward pass checked against
+# Keras (the reference implementation); only a bundle that passes is published as the latest.
+# The .h5 file does not carry its scaler, so the scaler is refitted on the same CSV
+# train_forecasting_model.py fits it on.
+PREDICT_TOLERANCE = 1e-5
+ROLLOUT_TOLERANCE = 1e-4
+
+print("--- Model Bundle Export Started ---")
+
+try:
+    model = load_model(MODEL_H5_PATH)
+    df = pd.read_csv("data/synthetic_fab_data.csv")
+except (FileNotFoundError, IOError) as e:
+    print(f"Error: {e}. Please run generate_synthetic_data.py and train_forecasting_model.py first.")
+    exit()
+
+data = df[FEATURE_COLUMNS].values
+scaler = MinMaxScaler(feature_range=(0, 1))
+scaled_data = scaler.fit_transform(data)
+
+weights = extract_keras_weights(model)
+residual_std = one_step_residual_std(NumpyLSTMForecaster(weights), scaled_data, SEQUENCE_LENGTH)
+bundle_args = (weights, scaler, FEATURE_COLUMNS, SEQUENCE_LENGTH, len(data), data_fingerprint(data))
+extra_metadata = {'source': MODEL_H5_PATH, 'residual_std': residual_std.tolist()}
+
+# --- Parity Check: NumPy vs Keras, on the bundle as persisted ---
+with tempfile.TemporaryDirectory() as scratch_dir:
+    bundle = load_bundle(save_bundle(*bundle_args, directory=scratch_dir, extra_metadata=extra_metadata))
+forecaster = bundle.forecaster
+
+scaler_error = np.abs(bundle.scale(data) - scaled_data).max()
+print(f"Persisted scaler max abs difference: {scaler_error:.2e}")
+
+rng = np.random.default_rng(0)
+windows = rng.random((32, SEQUENCE_LENGTH, len(FEATURE_COLUMNS)), dtype=np.float32)
+predict_error = np.abs(forecaster.predict(windows) - model.predict(windows, verbose=0)).max()
+print(f"Single-step max abs difference: {predict_error:.2e}")
+
+last_sequence = scaled_data[-SEQUENCE_LENGTH:].astype(np.float32)
+keras_rollout = KerasRolloutEngine(model).rollout(last_sequence, DAYS_PER_YEAR)
+numpy_rollout = forecaster.rollout(last_sequence, DAYS_PER_YEAR)
+rollout_error = np.abs(numpy_rollout - keras_rollout).max()
+print(f"1-year rollout max abs difference: {rollout_error:.2e}")
+
+if scaler_error > PREDICT_TOLERANCE or predict_error > PREDICT_TOLERANCE or rollout_error > ROLLOUT_TOLERANCE:
+    print("Parity check FAILED: NumPy backend does not match Keras. No bundle was published.")
+    sys.exit(1)
+print("Parity check passed.")
+bundle_path = save_bundle(*bundle_args, extra_metadata=extra_metadata)
+print(f"Model bundle written to '{bundle_path}'")
+print("--- Model Bundle Export Finished ---")
@@ -0,0 +1,115 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+# --- Fab Panel Layout ---
+# A panel holds the daily history of many fabs in one Parquet file: one row per (fab_id, date)
+# with a `scenario` label and the feature columns, sorted by fab_id then date, and one row
+# group per fab. Readers can therefore stream a fab at a time, and row counts per fab come
+# from the file metadata without reading any data.
+PANEL_PATH = 'data/synthetic_fab_panel.parquet'
+
+
+def is_panel(path):
+    """True for a Parquet file laid out as a fab panel (as opposed to a single-fab history)."""
+    if not str(path).endswith('.parquet'):
+        return False
+    import pyarrow.parquet as pq
+
+    return 'fab_id' in pq.read_schema(path).names
+
+
+def write_panel(path, fab_ids, scenarios, dates, values, feature_columns):
+    """Writes a [fabs, days, features] tensor as a panel file, one row group per fab."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for fab_id, scenario, fab_values in zip(fab_ids, scenarios, values):
+            frame = pd.DataFrame(fab_values, columns=feature_columns)
+            frame.insert(0, 'date', dates)
+            frame.insert(0, 'scenario', scenario)
+            frame.insert(0, 'fab_id', fab_id)
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table, row_group_size=len(frame))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def panel_fab_rows(path):
+    """Rows per fab, read from the row group metadata only."""
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(path).metadata
+    return [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+
+
+def iter_panel_fabs(path, feature_columns, fab_order=None):
+    """
+    Yields (fab_id, scenario, float64 [days, features]) one fab at a time, in file order or in
+    `fab_order` (row group indices). Each fab is its own row group, so any order reads the same.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for i in (range(parquet_file.num_row_groups) if fab_order is None else fab_order):
+        table = parquet_file.read_row_group(i, columns=['fab_id', 'scenario', *feature_columns])
+        values = np.column_stack([table.column(col).to_numpy() for col in feature_columns]).astype(np.float64)
+        yield table.column('fab_id')[0].as_py(), table.column('scenario')[0].as_py(), values
+
+
+def load_panel(path, feature_columns):
+    """
+    Returns (fab_ids, scenarios, values) with values as a [fabs, days, features] tensor.
+    Every fab must cover the same number of days, as generate_fab_panel.py writes them.
+    """
+    fab_ids, scenarios, values = [], [], []
+    for fab_id, scenario, fab_values in iter_panel_fabs(path, feature_columns):
+        fab_ids.append(fab_id)
+        scenarios.append(scenario)
+        values.append(fab_values)
+    if len({len(fab_values) for fab_values in values}) > 1:
+        raise ValueError(f"Fabs in '{path}' have histories of different lengths.")
+    return fab_ids, scenarios, np.stack(values)
+
+
+if __name__ == '__main__':
+    # Stress test: forecast every fab of a panel in one batched rollout and project its P&L.
+    from forecasting import DAYS_PER_YEAR, aggregate_yearly, forecast_panel
+    from model_bundle import load_bundle
+    from pnl import break_even_year, project_pnl
+
+    parser = argparse.ArgumentParser(description="Forecasts every fab in a panel and projects its P&L.")
+    parser.add_argument('--panel', default=PANEL_PATH)
+    parser.add_argument('--bundle', default=None, help="Model bundle (default: latest in model/bundles).")
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--initial-capex', type=float, default=10.0, help="Billion USD.")
+    parser.add_argument('--capacity-wpm', type=float, default=50000)
+    parser.add_argument('--chips-per-wafer', type=float, default=400)
+    parser.add_argument('--output', default='data/fab_panel_pnl.csv')
+    args = parser.parse_args()
+
+    bundle = load_bundle(args.bundle)
+    fab_ids, scenarios, values = load_panel(args.panel, bundle.feature_columns)
+    forecasts = aggregate_yearly(forecast_panel(bundle, values, args.years), args.years, columns=bundle.feature_columns)
+    pnl = project_pnl(forecasts, args.initial_capex, args.capacity_wpm, args.chips_per_wafer)
+    summary = pd.DataFrame({
+        'fab_id': fab_ids,
+        'scenario': scenarios,
+        'break_even_year': break_even_year(pnl['cumulative_profit_loss']),
+        'cumulative_profit_loss': pnl['cumulative_profit_loss'][:, -1],
+    })
+    summary.to_csv(args.output, index=False)
+    print(f"Forecast {len(fab_ids)} fabs x {args.years * DAYS_PER_YEAR} days with bundle v{bundle.version}.")
+    by_scenario = summary.groupby('scenario').agg(
+        fabs=('fab_id', 'size'),
+        break_even_share=('break_even_year', lambda years: years.notna().mean()),
+        median_break_even_year=('break_even_year', 'median'),
+        median_cumulative_pnl=('cumulative_profit_loss', 'median'),
+    )
+    print(by_scenario.to_string(float_format='{:.2f}'.format))
+    print(f"Per-fab results written to '{args.output}'")
@@ -0,0 +1,13 @@
+import hashlib
+
+# --- File Hashing ---
+# Content hashes used to recognize unchanged inputs (model bundles, site-data CSVs, rainfall
+# files). Kept free of other imports so every cache can use it cheaply.
+
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
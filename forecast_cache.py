@@ -0,0 +1,95 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# --- Forecast Cache ---
+# Daily forecast arrays keyed by (model bundle hash, historical data hash, horizon).
+# Entries are kept in an in-memory LRU and mirrored to .npy files on disk, so a restarted
+# Streamlit worker still skips the rollout. Both tiers are size-bounded.
+CACHE_DIR = 'cache/forecasts'
+
+
+def forecast_key(bundle_hash, data_hash, horizon_days, variant=''):
+    """`variant` separates other products of the same inputs, e.g. Monte Carlo runs."""
+    return hashlib.sha256(f'{bundle_hash}:{data_hash}:{int(horizon_days)}:{variant}'.encode()).hexdigest()
+
+
+class ForecastCache:
+    def __init__(self, directory=CACHE_DIR, max_memory_entries=32, max_disk_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.npy')
+
+    def _remember(self, key, values):
+        self._memory[key] = values
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get(self, key):
+        """Returns the cached array for `key`, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._memory[key]
+            path = self._path(key)
+            try:
+                values = np.load(path)
+            except (FileNotFoundError, ValueError, OSError):
+                self.stats['misses'] += 1
+                return None
+            os.utime(path)  # disk eviction is least-recently-used by mtime
+            self._remember(key, values)
+            self.stats['disk_hits'] += 1
+            return values
+
+    def put(self, key, values):
+        values = np.asarray(values)
+        values.setflags(write=False)
+        with self._lock:
+            self._remember(key, values)
+            path = self._path(key)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, values)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npy'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+            self.stats['evictions'] += 1
+
+    def get_or_compute(self, key, compute):
+        values = self.get(key)
+        if values is None:
+            values = compute()
+            self.put(key, values)
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for name in os.listdir(self.directory):
+                if name.endswith('.npy'):
+                    os.remove(os.path.join(self.directory, name))
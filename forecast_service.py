@@ -0,0 +1,228 @@
+import argparse
+import os
+import queue
+import secrets
+import stat
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+import numpy as np
+from forecasting import DAYS_PER_YEAR, iter_forecast_years
+from model_bundle import load_bundle
+
+# --- Shared Forecasting Service ---
+# An optional local process that holds one copy of the model bundle for every Streamlit
+# session and worker. Requests arriving within a short batching window are merged into one
+# batched rollout (identical requests share a single batch row) and each client gets its
+# forecast streamed back one year at a time. When the service is not running the page
+# falls back to in-process inference, also when the service is too slow to deliver a year.
+# The socket lives in a directory that must belong to the current user with mode 0700
+# ($XDG_RUNTIME_DIR by default), and connections authenticate with FORECAST_SERVICE_AUTHKEY or,
+# by default, a random key the server writes next to the socket.
+_SERVICE_DIR = (os.path.join(os.environ['XDG_RUNTIME_DIR'], 'silicorex_forecast') if os.environ.get('XDG_RUNTIME_DIR')
+                else os.path.join(tempfile.gettempdir(), f'silicorex_forecast-{os.getuid()}'))
+SOCKET_PATH = os.environ.get('FORECAST_SERVICE_SOCKET', os.path.join(_SERVICE_DIR, 'forecast.sock'))
+AUTHKEY_FILE = 'authkey'
+
+
+def check_private_dir(directory):
+    """Raises PermissionError unless `directory` is a real directory of the current user with mode 0700."""
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o700:
+        raise PermissionError(f"'{directory}' must be a directory owned by the current user with mode 0700.")
+
+
+def service_authkey(address=SOCKET_PATH, create=False):
+    """The key of the service at `address`; with `create`, the server generates a new one."""
+    if os.environ.get('FORECAST_SERVICE_AUTHKEY'):
+        return os.environ['FORECAST_SERVICE_AUTHKEY'].encode()
+    directory = os.path.dirname(os.path.abspath(address))
+    check_private_dir(directory)
+    path = os.path.join(directory, AUTHKEY_FILE)
+    if create:
+        key = secrets.token_hex(32).encode()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        # Never follows a planted symlink or reuses a file someone else created
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+        return key
+    with os.fdopen(os.open(path, os.O_RDONLY | os.O_NOFOLLOW), 'rb') as f:
+        return f.read()
+
+
+class ForecastServiceUnavailable(Exception):
+    pass
+
+
+# --- Client ---
+def iter_forecast_years_remote(bundle, history_values, years, address=SOCKET_PATH, timeout=1.0, year_timeout=5.0):
+    """
+    Same contract as forecasting.iter_forecast_years, served by the shared service.
+
+    Raises ForecastServiceUnavailable if the service is not reachable, runs a different bundle,
+    or takes longer than `year_timeout` seconds to deliver a year (e.g. busy with another batch).
+    """
+    try:
+        connection = Client(address, family='AF_UNIX', authkey=service_authkey(address))
+    except (OSError, EOFError, ValueError, AuthenticationError) as e:
+        raise ForecastServiceUnavailable(f"Forecast service not reachable at '{address}': {e}")
+    with connection:
+        connection.send({
+            'bundle_sha256': bundle.sha256,
+            'seed_values': np.asarray(history_values[-bundle.sequence_length:], dtype=np.float64),
+            'years': int(years),
+        })
+        if not connection.poll(timeout):
+            raise ForecastServiceUnavailable("Forecast service did not answer.")
+        status, detail = connection.recv()
+        if status != 'accepted':
+            raise ForecastServiceUnavailable(detail)
+        while True:
+            if not connection.poll(year_timeout):
+                raise ForecastServiceUnavailable("Forecast service is too slow to answer.")
+            message = connection.recv()
+            if message[0] == 'done':
+                return
+            if message[0] == 'error':
+                raise ForecastServiceUnavailable(message[1])
+            _, year, daily_values = message
+            yield year, daily_values
+
+
+def iter_forecast_years_shared(bundle, history_values, years, address=SOCKET_PATH):
+    """Uses the shared service when it is running, otherwise runs the rollout in-process."""
+    completed = 0
+    try:
+        for year, daily_values in iter_forecast_years_remote(bundle, history_values, years, address=address):
+            completed = year
+            yield year, daily_values
+        return
+    except (ForecastServiceUnavailable, OSError, EOFError, AuthenticationError):
+        pass
+    # Local fallback; if the service dropped mid-stream, skip the years already delivered
+    for year, daily_values in iter_forecast_years(bundle, history_values, years):
+        if year > completed:
+            yield year, daily_values
+
+
+# --- Server ---
+class ForecastServer:
+    def __init__(self, bundle, address=SOCKET_PATH, batch_window=0.05, max_batch=64):
+        self.bundle = bundle
+        self.address = address
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._requests = queue.Queue()
+        self.stats = {'requests': 0, 'batches': 0, 'batch_rows': 0}
+
+    def serve_forever(self):
+        directory = os.path.dirname(os.path.abspath(self.address))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # An existing directory may have been planted by another user: refuse to start in it
+        check_private_dir(directory)
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        authkey = service_authkey(self.address, create=True)
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        # The socket is created owner-only, so it is never connectable by others, even briefly
+        umask = os.umask(0o077)
+        try:
+            listener = Listener(self.address, family='AF_UNIX', authkey=authkey)
+        finally:
+            os.umask(umask)
+        with listener:
+            print(f"Forecast service (bundle v{self.bundle.version}) listening on {self.address}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except AuthenticationError as e:
+                    print(f"Rejected a forecast service connection: {e}")
+                    continue
+                except (OSError, EOFError):
+                    continue
+                threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection):
+        try:
+            request = connection.recv()
+            if request.get('bundle_sha256') != self.bundle.sha256:
+                connection.send(('error', f"Service runs bundle v{self.bundle.version} ({self.bundle.sha256[:12]}), not the requested one."))
+                connection.close()
+                return
+            connection.send(('accepted', self.bundle.sha256))
+            self._requests.put((request, connection))
+        except (OSError, EOFError):
+            connection.close()
+
+    def _collect_batch(self):
+        batch = [self._requests.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                for _, connection in batch:
+                    try:
+                        connection.send(('error', str(e)))
+                    except (OSError, EOFError):
+                        pass
+            finally:
+                for _, connection in batch:
+                    connection.close()
+
+    def _run_batch(self, batch):
+        # Identical seed windows share one batch row; the batch runs to the longest horizon
+        rows, row_of_request = {}, []
+        for request, _ in batch:
+            seed = np.ascontiguousarray(request['seed_values'])
+            row_of_request.append(rows.setdefault(seed.tobytes(), (len(rows), seed))[0])
+        seeds = np.stack([seed for _, seed in sorted(rows.values(), key=lambda row: row[0])])
+        years = max(request['years'] for request, _ in batch)
+        self.stats['requests'] += len(batch)
+        self.stats['batches'] += 1
+        self.stats['batch_rows'] += len(seeds)
+
+        scaled_seeds = self.bundle.scale(seeds)
+        chunks = self.bundle.forecaster.iter_rollout(scaled_seeds, DAYS_PER_YEAR * years, chunk_size=DAYS_PER_YEAR)
+        open_connections = {index for index in range(len(batch))}
+        for year, scaled_chunk in enumerate(chunks, start=1):
+            daily_values = self.bundle.inverse_scale(scaled_chunk)
+            for index in list(open_connections):
+                request, connection = batch[index]
+                try:
+                    connection.send(('year', year, daily_values[row_of_request[index]]))
+                    if year == request['years']:
+                        connection.send(('done',))
+                        open_connections.discard(index)
+                except (OSError, EOFError):
+                    open_connections.discard(index)  # client went away (e.g. cancelled)
+            if not open_connections:
+                break
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Shared LSTM forecasting service for the Profit & Loss page.")
+    parser.add_argument('--socket', default=SOCKET_PATH, help="Unix socket path to listen on.")
+    parser.add_argument('--bundle', default=None, help="Model bundle to serve (default: latest in model/bundles).")
+    parser.add_argument('--batch-window-ms', type=float, default=50.0, help="How long to wait for more requests to merge into a batch.")
+    args = parser.parse_args()
+
+    ForecastServer(load_bundle(args.bundle), address=args.socket, batch_window=args.batch_window_ms / 1000).serve_forever()
@@ -0,0 +1,128 @@
+import threading
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- Forecasting Constants (must be identical to training) ---
+FEATURE_COLUMNS = ['average_selling_price_usd', 'silicon_wafer_cost_usd', 'energy_cost_per_kwh_usd', 'total_daily_labor_cost_usd']
+SEQUENCE_LENGTH = 60
+DAYS_PER_YEAR = 365
+
+MODEL_H5_PATH = 'model/fab_lstm_forecaster.h5'
+
+
+def aggregate_yearly(predicted_values, years, columns=FEATURE_COLUMNS):
+    """
+    Averages daily predictions into one value per forecast year for each column.
+
+    `predicted_values` is [days, features] or [samples, days, features]; each returned
+    array is [years] or [samples, years] accordingly.
+    """
+    predicted_values = np.asarray(predicted_values)[..., :years * DAYS_PER_YEAR, :]
+    yearly = predicted_values.reshape(*predicted_values.shape[:-2], years, DAYS_PER_YEAR, -1).mean(axis=-2)
+    return {col: yearly[..., i] for i, col in enumerate(columns)}
+
+
+def one_step_residual_std(forecaster, scaled_data, sequence_length):
+    """
+    Per-feature std of the model's one-day-ahead errors over every window of `scaled_data`
+    (the first predicted day, for direct multi-horizon models).
+    """
+    windows = sliding_window_view(scaled_data[:-1], sequence_length, axis=0).transpose(0, 2, 1)
+    residuals = forecaster.predict(windows)[:, :forecaster.n_features] - scaled_data[sequence_length:]
+    return residuals.std(axis=0)
+
+
+def simulate_forecast_paths(bundle, history_values, years, samples, seed=0):
+    """
+    Monte Carlo forecast: `samples` noisy rollouts run together as one batch.
+
+    Each predicted day is perturbed by the bundle's one-step residual std before it is fed
+    back into the window. Bundles trained before that was recorded fall back to the std of
+    day-to-day changes in the scaled history. Returns [samples, days, features] in real units.
+    """
+    scaled_history = bundle.scale(history_values)
+    noise_std = bundle.metadata.get('residual_std')
+    if noise_std is None:
+        noise_std = np.diff(scaled_history, axis=0).std(axis=0)
+    seed_window = np.broadcast_to(scaled_history[-bundle.sequence_length:], (samples, bundle.sequence_length, scaled_history.shape[1]))
+    paths = bundle.forecaster.rollout(seed_window, DAYS_PER_YEAR * years, noise_std=noise_std, rng=np.random.default_rng(seed))
+    return bundle.inverse_scale(paths)
+
+
+def forecast_panel(bundle, panel_values, years):
+    """
+    Forecasts every fab of a panel in one batched rollout: a [fabs, days, features] history
+    gives [fabs, years * DAYS_PER_YEAR, features] in real units.
+    """
+    seeds = bundle.scale(np.asarray(panel_values)[:, -bundle.sequence_length:])
+    return bundle.inverse_scale(bundle.forecaster.rollout(seeds, DAYS_PER_YEAR * years))
+
+
+# --- Progressive Forecasting ---
+def iter_forecast_years(bundle, history_values, years):
+    """Yields (year, daily values in real units) as soon as each forecast year is complete."""
+    last_sequence = bundle.scale(history_values[-bundle.sequence_length:])
+    chunks = bundle.forecaster.iter_rollout(last_sequence, DAYS_PER_YEAR * years, chunk_size=DAYS_PER_YEAR)
+    for year, scaled_chunk in enumerate(chunks, start=1):
+        yield year, bundle.inverse_scale(scaled_chunk)
+
+
+class ForecastJob:
+    """
+    Runs `iter_forecast_years` (or another `source` with the same signature) on a background
+    thread so a caller can redraw after every completed year and cancel the rollout between
+    years. The job outlives a Streamlit rerun, so it can be kept in st.session_state and
+    picked up again.
+    """
+
+    def __init__(self, bundle, history_values, years, source=None):
+        self.years = years
+        self._source = source or iter_forecast_years
+        self.finished = False
+        self.error = None
+        self._chunks = []
+        self._condition = threading.Condition()
+        self._cancel_event = threading.Event()
+        seed_values = np.array(history_values[-bundle.sequence_length:])
+        self._thread = threading.Thread(target=self._run, args=(bundle, seed_values), daemon=True)
+        self._thread.start()
+
+    def _run(self, bundle, seed_values):
+        years = self._source(bundle, seed_values, self.years)
+        try:
+            for _, daily_values in years:
+                if self._cancel_event.is_set():
+                    break
+                with self._condition:
+                    self._chunks.append(daily_values)
+                    self._condition.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            years.close()
+            with self._condition:
+                self.finished = True
+                self._condition.notify_all()
+
+    @property
+    def completed_years(self):
+        return len(self._chunks)
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def wait(self, completed_years, timeout=None):
+        """Blocks until more than `completed_years` years are done or the job has finished."""
+        with self._condition:
+            self._condition.wait_for(lambda: len(self._chunks) > completed_years or self.finished, timeout)
+            return len(self._chunks)
+
+    def daily_values(self):
+        """All completed days so far, [completed_years * 365, features]."""
+        with self._condition:
+            chunks = list(self._chunks)
+        return np.concatenate(chunks, axis=0) if chunks else np.empty((0, 0))
@@ -0,0 +1,103 @@
+import argparse
+import json
+import numpy as np
+from fab_panel import PANEL_PATH, write_panel
+from generate_synthetic_data import SERIES
+
+# --- Panel Specification ---
+# Every fab follows the same drifting random walks as generate_synthetic_data.py, but the daily
+# shocks of the four metrics are correlated (energy and wafer costs tend to move together), the
+# fab's base levels are dispersed around the single-fab values, each macro scenario shifts the
+# drifts and scales the volatility, and every fab switches at random between a calm and a
+# stressed regime. A JSON file passed with --spec overrides any of these keys.
+METRICS = list(SERIES)
+PANEL_SPEC = {
+    'base': [base for base, _, _ in SERIES.values()],
+    'growth': [growth for _, growth, _ in SERIES.values()],
+    'volatility': [volatility for _, _, volatility in SERIES.values()],
+    # Correlation of the daily shocks, in METRICS order
+    'correlation': [
+        [1.0, 0.1, 0.0, 0.0],
+        [0.1, 1.0, 0.6, 0.2],
+        [0.0, 0.6, 1.0, 0.2],
+        [0.0, 0.2, 0.2, 1.0],
+    ],
+    'base_dispersion': 0.1,  # std of the log of each fab's base levels
+    'regimes': {
+        'names': ['calm', 'stressed'],
+        # Daily probability of leaving each regime
+        'switch_probability': [1 / 365, 1 / 90],
+        'volatility_multiplier': [1.0, 2.5],
+        'growth_shift': [[0.0, 0.0, 0.0, 0.0], [-0.0005, 0.0005, 0.001, 0.0]],
+    },
+    'scenarios': {
+        'baseline': {'growth_shift': [0.0, 0.0, 0.0, 0.0], 'volatility_multiplier': 1.0},
+        'energy_crisis': {'growth_shift': [0.0, 0.0002, 0.0008, 0.0], 'volatility_multiplier': 1.5},
+        'asp_downturn': {'growth_shift': [-0.0008, 0.0, 0.0, 0.0], 'volatility_multiplier': 1.0},
+    },
+}
+
+
+def generate_panel(fabs_per_scenario, days, spec=PANEL_SPEC, seed=None):
+    """
+    Returns (fab_ids, scenarios, regimes, values): values is a [fabs, days, metrics] tensor,
+    regimes the [fabs, days] regime index. All fabs and days are drawn in one vectorized pass;
+    only the regime chain steps through the days, for all fabs at once.
+    """
+    rng = np.random.default_rng(seed)
+    scenario_names = list(spec['scenarios'])
+    scenario_index = np.repeat(np.arange(len(scenario_names)), fabs_per_scenario)
+    fabs = len(scenario_index)
+    n_metrics = len(spec['base'])
+
+    scenario_shift = np.array([spec['scenarios'][name]['growth_shift'] for name in scenario_names])[scenario_index]
+    scenario_volatility = np.array([spec['scenarios'][name]['volatility_multiplier'] for name in scenario_names])[scenario_index]
+
+    # Two-state Markov chain per fab; fabs start in the calm regime
+    regimes = spec['regimes']
+    leave = np.asarray(regimes['switch_probability'])
+    switch_draws = rng.random((fabs, days))
+    regime = np.zeros((fabs, days), dtype=np.int8)
+    for day in range(1, days):
+        previous = regime[:, day - 1]
+        regime[:, day] = np.where(switch_draws[:, day] < leave[previous], 1 - previous, previous)
+
+    # Correlated shocks: standard normals times the Cholesky factor of the correlation matrix
+    cholesky = np.linalg.cholesky(np.asarray(spec['correlation']))
+    shocks = rng.standard_normal((fabs, days, n_metrics)) @ cholesky.T
+    volatility = (np.asarray(spec['volatility'])
+                  * scenario_volatility[:, np.newaxis, np.newaxis]
+                  * np.asarray(regimes['volatility_multiplier'])[regime][..., np.newaxis])
+    growth = (np.asarray(spec['growth'])
+              + scenario_shift[:, np.newaxis, :]
+              + np.asarray(regimes['growth_shift'])[regime])
+    base = np.asarray(spec['base']) * np.exp(spec['base_dispersion'] * rng.standard_normal((fabs, 1, n_metrics)))
+    values = base * np.cumprod(1 + growth + volatility * shocks, axis=1)
+
+    fab_ids = [f'fab_{i:04d}' for i in range(fabs)]
+    return fab_ids, [scenario_names[i] for i in scenario_index], regime, values
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generates a multi-fab, multi-scenario panel of synthetic fab data.")
+    parser.add_argument('--fabs-per-scenario', type=int, default=100)
+    parser.add_argument('--days', type=int, default=1500)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--spec', default=None, help="JSON file overriding keys of the default panel spec.")
+    parser.add_argument('--start-date', type=lambda value: np.datetime64(value, 'D'), default=None, help="Date of the first row (default: the data ends today).")
+    parser.add_argument('--output', default=PANEL_PATH)
+    args = parser.parse_args()
+
+    spec = dict(PANEL_SPEC)
+    if args.spec:
+        with open(args.spec) as f:
+            spec.update(json.load(f))
+
+    print("Starting fab panel generation...")
+    fab_ids, scenarios, regimes, values = generate_panel(args.fabs_per_scenario, args.days, spec, args.seed)
+    start_date = args.start_date if args.start_date is not None else np.datetime64('today', 'D') - np.timedelta64(args.days - 1, 'D')
+    write_panel(args.output, fab_ids, scenarios, start_date + np.arange(args.days), values, METRICS)
+
+    print(f"Successfully generated {len(fab_ids)} fabs x {args.days} days x {len(METRICS)} metrics "
+          f"across {len(spec['scenarios'])} scenarios ({regimes.mean():.1%} of fab-days in the stressed regime).")
+    print(f"File saved to: {args.output}")
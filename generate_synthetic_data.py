@@ -1,11 +1,12 @@
-import pandas as pd
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from datetime import datetime, timedelta
-
-print("Starting synthetic data generation...")
+import pandas as pd
 
 # --- Configuration Parameters You Can Tune ---
-num_rows = 1500  # <--- YOU CAN CHANGE THIS NUMBER. Set to 1500 to exceed the 700-row minimum.
+num_rows = 1500  # <--- YOU CAN CHANGE THIS NUMBER (or pass --rows). Set to 1500 to exceed the 700-row minimum.
 
 # Revenue Parameters
 base_asp = 8.50      # Average selling price of a chip in USD
@@ -15,6 +16,7 @@ asp_volatility = 0.01  # Daily price fluctuation
 # Cost Parameters
 base_wafer_cost = 250      # Cost per silicon wafer
 wafer_cost_growth = 0.0001 # Slow, steady growth
+wafer_cost_volatility = 0.001
 
 base_energy_cost_kwh = 0.09 # Industrial electricity rate in USD
 energy_cost_growth = 0.00015
@@ -22,41 +24,118 @@ energy_volatility = 0.005
 
 base_labor_cost_per_day = 500000 # Aggregate daily labor cost for the fab
 labor_cost_growth = 0.0002       # Reflects salary inflation
+labor_cost_volatility = 0.0005
+
+# Every series is a "random walk" with drift: base * cumprod(1 + normal(growth, volatility))
+SERIES = {
+    'average_selling_price_usd': (base_asp, asp_growth, asp_volatility),
+    'silicon_wafer_cost_usd': (base_wafer_cost, wafer_cost_growth, wafer_cost_volatility),
+    'energy_cost_per_kwh_usd': (base_energy_cost_kwh, energy_cost_growth, energy_volatility),
+    'total_daily_labor_cost_usd': (base_labor_cost_per_day, labor_cost_growth, labor_cost_volatility),
+}
+_BASE, _GROWTH, _VOLATILITY = (np.array(param) for param in zip(*SERIES.values()))
+
+# --- Chunked Generation ---
+# The rows are generated in chunks, each from its own child of one SeedSequence, so the output
+# depends only on the seed and the chunk size, never on the number of worker processes. The
+# random walks must stay continuous across chunks, so generation runs in two passes: the first
+# only computes each chunk's total growth factor, a prefix product over those gives every chunk
+# its starting level, and the second pass regenerates the same draws and writes the rows. No
+# pass holds more than one chunk per worker in memory.
+CHUNK_ROWS = 1_000_000
+
+
+def _chunk_growth(seed, rows, growth):
+    """Cumulative growth factor of one chunk's random walks."""
+    returns = np.random.default_rng(seed).normal(loc=growth, scale=_VOLATILITY, size=(rows, len(SERIES)))
+    return np.cumprod(1 + returns, axis=0)[-1]
+
+
+def _chunk_frame(seed, rows, growth, level, first_date):
+    """Regenerates a chunk's draws and scales its walks to continue from `level`."""
+    returns = np.random.default_rng(seed).normal(loc=growth, scale=_VOLATILITY, size=(rows, len(SERIES)))
+    values = level * np.cumprod(1 + returns, axis=0)
+    frame = pd.DataFrame(values, columns=list(SERIES))
+    frame.insert(0, 'date', first_date + np.arange(rows))
+    return frame
+
+
+def _write_parquet_chunk(index, seed, rows, growth, level, first_date, output_dir):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    frame = _chunk_frame(seed, rows, growth, level, first_date)
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), os.path.join(output_dir, f'part-{index:05d}.parquet'))
+    return rows
+
+
+def chunk_plan(rows, chunk_rows, seed, start_date, growth_scale=1.0, workers=None):
+    """
+    First pass: returns [(seed, rows, daily growth, starting level, first date)] for every chunk.
+    The per-chunk growth factors are computed in parallel, the prefix product sequentially.
+    """
+    sizes = [min(chunk_rows, rows - start) for start in range(0, rows, chunk_rows)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    growth = _GROWTH * growth_scale
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        factors = list(pool.map(_chunk_growth, seeds, sizes, [growth] * len(sizes)))
+    levels = [_BASE]
+    for factor in factors:
+        levels.append(levels[-1] * factor)
+    if not np.all(np.isfinite(levels)):
+        raise ValueError(f"The daily growth rates compound beyond the float range over {rows} rows; "
+                         "lower them with --growth-scale (0 keeps the walks driftless).")
+    first_dates = [start_date + np.timedelta64(start, 'D') for start in range(0, rows, chunk_rows)]
+    return list(zip(seeds, sizes, [growth] * len(sizes), levels[:-1], first_dates))
 
-# --- Data Generation ---
 
-# Create a date range ending today
-end_date = datetime.now()
-start_date = end_date - timedelta(days=num_rows - 1)
-dates = pd.date_range(start=start_date, end=end_date, freq='D')
+def write_parquet(plan, output_dir, workers=None):
+    """Second pass: every worker writes its chunks as part-NNNNN.parquet files in `output_dir`."""
+    os.makedirs(output_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(output_dir, 'part-*.parquet')):
+        os.remove(stale)  # partitions left over from a longer run would be read as data
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_write_parquet_chunk, index, *chunk, output_dir) for index, chunk in enumerate(plan)]
+        return sum(future.result() for future in futures)
 
-# 1. Generate Revenue Data
-# Simulate a "random walk" with an upward drift for the average selling price
-asp_daily_returns = np.random.normal(loc=asp_growth, scale=asp_volatility, size=num_rows)
-synthetic_asp = base_asp * np.cumprod(1 + asp_daily_returns)
 
-# 2. Generate Cost Data
-wafer_cost_returns = np.random.normal(loc=wafer_cost_growth, scale=0.001, size=num_rows)
-synthetic_wafer_cost = base_wafer_cost * np.cumprod(1 + wafer_cost_returns)
+def write_csv(plan, output_path):
+    """Second pass for CSV output: chunks are appended in order, one at a time."""
+    total = 0
+    for index, chunk in enumerate(plan):
+        frame = _chunk_frame(*chunk)
+        frame.to_csv(output_path, index=False, mode='w' if index == 0 else 'a', header=index == 0)
+        total += len(frame)
+    return total
 
-energy_cost_returns = np.random.normal(loc=energy_cost_growth, scale=energy_volatility, size=num_rows)
-synthetic_energy_cost = base_energy_cost_kwh * np.cumprod(1 + energy_cost_returns)
 
-labor_cost_returns = np.random.normal(loc=labor_cost_growth, scale=0.0005, size=num_rows)
-synthetic_labor_cost = base_labor_cost_per_day * np.cumprod(1 + labor_cost_returns)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generates the synthetic fab cost and price history.")
+    parser.add_argument('--rows', type=int, default=num_rows)
+    parser.add_argument('--seed', type=int, default=None, help="Makes the output bit-reproducible (default: fresh entropy, printed).")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--output', default=None, help="CSV file, or directory of Parquet partitions "
+                        "(default: data/synthetic_fab_data.csv or data/synthetic_fab_data/).")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="Rows per chunk (and per Parquet partition).")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--growth-scale', type=float, default=1.0, help="Multiplies the daily growth rates; needed for 10^7+ rows, "
+                        "where the default drifts compound beyond the float range.")
+    parser.add_argument('--start-date', type=lambda value: np.datetime64(value, 'D'), default=None, help="Date of the first row (default: the data ends today).")
+    args = parser.parse_args()
 
-# --- Assemble the DataFrame ---
-df = pd.DataFrame({
-    'date': dates,
-    'average_selling_price_usd': synthetic_asp,
-    'silicon_wafer_cost_usd': synthetic_wafer_cost,
-    'energy_cost_per_kwh_usd': synthetic_energy_cost,
-    'total_daily_labor_cost_usd': synthetic_labor_cost
-})
+    print("Starting synthetic data generation...")
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+    # numpy dates, because 10^7+ daily rows reach far beyond the years Python's datetime supports
+    start_date = args.start_date if args.start_date is not None else np.datetime64('today', 'D') - np.timedelta64(args.rows - 1, 'D')
+    plan = chunk_plan(args.rows, args.chunk_rows, seed, start_date, args.growth_scale, args.workers)
 
-# --- Save to CSV ---
-output_path = 'data/synthetic_fab_data.csv'
-df.to_csv(output_path, index=False)
+    # --- Save to CSV or Parquet ---
+    if args.format == 'parquet':
+        output_path = args.output or 'data/synthetic_fab_data'
+        total = write_parquet(plan, output_path, args.workers)
+    else:
+        output_path = args.output or 'data/synthetic_fab_data.csv'
+        total = write_csv(plan, output_path)
 
-print(f"Successfully generated synthetic dataset with {len(df)} rows.")
-print(f"File saved to: {output_path}")
\ No newline at end of file
+    print(f"Successfully generated synthetic dataset with {total} rows in {len(plan)} chunk(s) (seed {seed}).")
+    print(f"File saved to: {output_path}")
@@ -0,0 +1,39 @@
+import numpy as np
+import tensorflow as tf
+from forecasting import SEQUENCE_LENGTH
+
+
+class KerasRolloutEngine:
+    """
+    Runs the day-by-day autoregressive forecast of a Keras model as one compiled graph.
+
+    The seed window and every prediction live in a single preallocated buffer, so each
+    step reads its 60-day window as a slice instead of rebuilding the batch with np.append,
+    and the whole loop costs one graph call instead of one model.predict per day.
+    This is the reference implementation that the NumPy backend in lstm_numpy.py is checked against.
+    """
+
+    def __init__(self, model, sequence_length=SEQUENCE_LENGTH):
+        self.model = model
+        self.sequence_length = sequence_length
+        self.n_features = model.output_shape[-1]
+        self._buffer = tf.Variable(
+            tf.zeros((sequence_length, self.n_features), dtype=tf.float32),
+            shape=tf.TensorShape([None, self.n_features]),
+            trainable=False,
+        )
+        self._rollout = tf.function(self._rollout_graph)
+
+    def _rollout_graph(self, steps):
+        for i in tf.range(steps):
+            window = self._buffer[i:i + self.sequence_length]
+            next_prediction = self.model(window[tf.newaxis], training=False)
+            self._buffer[i + self.sequence_length].assign(next_prediction[0])
+        return self._buffer[self.sequence_length:]
+
+    def rollout(self, last_sequence, steps):
+        """Predicts `steps` days after `last_sequence` (scaled, shape [sequence_length, n_features])."""
+        buffer = np.zeros((self.sequence_length + steps, self.n_features), dtype=np.float32)
+        buffer[:self.sequence_length] = last_sequence[-self.sequence_length:]
+        self._buffer.assign(buffer)
+        return self._rollout(tf.constant(steps, dtype=tf.int32)).numpy()
@@ -0,0 +1,173 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from site_report import MODEL_NAME, TRANSLATION_SEPARATOR
+
+# --- LLM Backends ---
+# The report code only needs two calls from an LLM: generate(prompt) returning the full text and
+# stream(prompt) yielding text chunks. GeminiBackend wraps google.generativeai (imported lazily, so
+# the others work without it). StubBackend answers deterministically from the prompt at a
+# configurable time-to-first-token and token rate, with optional injected failures, and
+# HTTPBackend talks to the same stub served over HTTP (`python llm_backends.py`), so report
+# latency can be measured and tested without the live API.
+STUB_PORT = 8765
+HTTP_MODEL_NAME = 'stub-http'
+
+
+def count_tokens(text):
+    """Approximate token count: words and punctuation marks."""
+    return len(re.findall(r'\w+|[^\w\s]', text))
+
+
+class LLMBackend:
+    model_name = None
+
+    def generate(self, prompt):
+        return "".join(self.stream(prompt))
+
+    def stream(self, prompt):
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    def __init__(self, api_key, model_name=MODEL_NAME):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        return self._model.generate_content(prompt).text
+
+    def stream(self, prompt):
+        for chunk in self._model.generate_content(prompt, stream=True):
+            yield chunk.text
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic stand-in for an LLM. Report prompts get a fixed three-section narrative naming
+    the district, translation prompts get the source lines back tagged as Kannada. Responses
+    start after `first_token_seconds` and then arrive at `tokens_per_second` (0: instantly), in
+    chunks of `chunk_tokens`; `failure_rate` makes that share of calls raise, to exercise retries.
+    """
+    model_name = 'stub'
+
+    def __init__(self, first_token_seconds=0.0, tokens_per_second=0.0, chunk_tokens=8, failure_rate=0.0, seed=0):
+        self.first_token_seconds = first_token_seconds
+        self.tokens_per_second = tokens_per_second
+        self.chunk_tokens = chunk_tokens
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def respond(self, prompt):
+        """The full response text, without any delay."""
+        if TRANSLATION_SEPARATOR in prompt:
+            # Every line of the source, after its number in a batched request, is tagged as Kannada
+            source = prompt.split(TRANSLATION_SEPARATOR, 1)[1]
+            return "\n".join(re.sub(r'^(\d+\.\s)?', lambda match: f"{match.group(0)}[kn] ", line) for line in source.split("\n"))
+        location = re.search(r'\*\*Analysis Location:\*\* (.+)', prompt)
+        location = location.group(1).strip() if location else 'the site'
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        return (f"**Parameter Significance**\n\nWater, industry and logistics decide whether a fab in {location} can run.\n\n"
+                f"**Data-Driven Analysis**\n\nEach KPI is analyzed against its benchmark (stub {digest}).\n\n"
+                f"**Synthesis & Conclusion**\n\nThe ratings above summarize {location}.")
+
+    def stream(self, prompt):
+        with self._lock:
+            fail = self._rng.random() < self.failure_rate
+        time.sleep(self.first_token_seconds)
+        if fail:
+            raise RuntimeError("Stub LLM: injected failure.")
+        # The tokens of count_tokens, each keeping its trailing whitespace so the chunks join back into the text
+        tokens = re.findall(r'\s+|\w+\s*|[^\w\s]\s*', self.respond(prompt))
+        for start in range(0, len(tokens), self.chunk_tokens):
+            chunk = tokens[start:start + self.chunk_tokens]
+            if start and self.tokens_per_second:
+                time.sleep(len(chunk) / self.tokens_per_second)
+            yield "".join(chunk)
+
+
+class HTTPBackend(LLMBackend):
+    """Client of the stub server; the response body is streamed as the server flushes it."""
+
+    def __init__(self, url, model_name=HTTP_MODEL_NAME, timeout=60):
+        self.url = url.rstrip('/')
+        self.model_name = model_name
+        self.timeout = timeout
+
+    def stream(self, prompt):
+        request = urllib.request.Request(f'{self.url}/generate', data=json.dumps({'prompt': prompt}).encode(),
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            while chunk := response.read1(65536):
+                yield chunk.decode('utf-8')
+
+
+def make_backend(spec, api_key=None):
+    """A backend from its name: 'gemini', 'stub' or the URL of a stub server."""
+    if spec == 'gemini':
+        return GeminiBackend(api_key)
+    if spec == 'stub':
+        return StubBackend()
+    if spec.startswith(('http://', 'https://')):
+        return HTTPBackend(spec)
+    raise ValueError(f"Unknown LLM backend '{spec}': use 'gemini', 'stub' or a stub server URL.")
+
+
+def backend_model_name(spec):
+    """The model_name of the backend make_backend(spec) would return, without creating it."""
+    if spec == 'gemini':
+        return MODEL_NAME
+    if spec == 'stub':
+        return StubBackend.model_name
+    if spec.startswith(('http://', 'https://')):
+        return HTTP_MODEL_NAME
+    raise ValueError(f"Unknown LLM backend '{spec}': use 'gemini', 'stub' or a stub server URL.")
+
+
+def serve_stub(backend, port=STUB_PORT):
+    """Serves `backend` at POST /generate ({"prompt": ...}), streaming the response with chunked encoding."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            prompt = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['prompt']
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in backend.stream(prompt):
+                data = chunk.encode('utf-8')
+                self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+                self.wfile.flush()
+            self.wfile.write(b'0\r\n\r\n')
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serves the deterministic stub LLM over HTTP.")
+    parser.add_argument('--port', type=int, default=STUB_PORT)
+    parser.add_argument('--first-token-seconds', type=float, default=0.5)
+    parser.add_argument('--tokens-per-second', type=float, default=50)
+    parser.add_argument('--chunk-tokens', type=int, default=8)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = serve_stub(StubBackend(args.first_token_seconds, args.tokens_per_second, args.chunk_tokens, args.failure_rate), args.port)
+    print(f"Stub LLM listening on http://127.0.0.1:{args.port} (use it with LLM_BACKEND or --backend set to that URL).")
+    server.serve_forever()
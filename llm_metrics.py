@@ -0,0 +1,132 @@
+import csv
+import os
+import threading
+import time
+import pandas as pd
+from llm_backends import LLMBackend, count_tokens
+
+# --- LLM Latency Metrics ---
+# Every LLM call made through an instrumented backend records its time to first token, total
+# latency, token count and tokens per second. Every report records the same as the user sees
+# it (first chunk shown, whole report), plus, for Kannada, the translation overhead: the time
+# the report took beyond its English generation. Records are appended to a CSV file, which is
+# the export; summarize() turns it into percentiles per backend, kind and language.
+METRICS_PATH = 'cache/llm_metrics.csv'
+FIELDS = ['recorded_at', 'model', 'kind', 'district', 'language', 'ttft_seconds', 'total_seconds',
+          'tokens', 'tokens_per_second', 'translation_overhead_seconds']
+
+
+class LatencyRecorder:
+    def __init__(self, path=METRICS_PATH):
+        self.path = path
+        self.records = []
+        self._lock = threading.Lock()
+
+    def record(self, **fields):
+        row = {'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'), **fields}
+        with self._lock:
+            self.records.append(row)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                new_file = not os.path.exists(self.path)
+                with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=FIELDS)
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerow(row)
+
+    def instrument(self, backend, kind, **labels):
+        """`backend` with every call recorded under `kind` ('report' or 'translation') and `labels`."""
+        return InstrumentedBackend(backend, self, kind, labels)
+
+
+class InstrumentedBackend(LLMBackend):
+    def __init__(self, backend, recorder, kind, labels):
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.recorder = recorder
+        self.kind = kind
+        self.labels = labels
+
+    def _record(self, started, first_token, parts):
+        total = time.perf_counter() - started
+        tokens = count_tokens("".join(parts))
+        # Decoding rate of the tokens after the first chunk; a response in one piece only has its overall rate
+        if len(parts) > 1:
+            decoded, generating = tokens - count_tokens(parts[0]), total - (first_token - started)
+        else:
+            decoded, generating = tokens, total
+        self.recorder.record(model=self.model_name, kind=self.kind, ttft_seconds=round(first_token - started, 4),
+                             total_seconds=round(total, 4), tokens=tokens,
+                             tokens_per_second=round(decoded / generating, 1) if generating > 0 else None, **self.labels)
+
+    def generate(self, prompt):
+        started = time.perf_counter()
+        text = self.backend.generate(prompt)
+        # A blocking call's first token arrives with the last one
+        self._record(started, time.perf_counter(), [text])
+        return text
+
+    def stream(self, prompt):
+        started = time.perf_counter()
+        first_token, parts = None, []
+        for chunk in self.backend.stream(prompt):
+            first_token = first_token or time.perf_counter()
+            parts.append(chunk)
+            yield chunk
+        self._record(started, first_token or time.perf_counter(), parts)
+
+
+def summarize(path=METRICS_PATH):
+    """Median and 95th percentile of each latency metric per model, kind and language."""
+    metrics = pd.read_csv(path)
+    columns = ['ttft_seconds', 'total_seconds', 'tokens_per_second', 'translation_overhead_seconds']
+    grouped = metrics.groupby(['model', 'kind', 'language'])[columns]
+    summary = pd.concat({'p50': grouped.median(), 'p95': grouped.quantile(0.95)}, axis=1).swaplevel(axis=1)
+    summary.insert(0, ('calls', ''), metrics.groupby(['model', 'kind', 'language']).size())
+    return summary[[('calls', '')] + [(column, stat) for column in columns for stat in ('p50', 'p95')]].dropna(axis=1, how='all')
+
+
+if __name__ == '__main__':
+    # Offline latency benchmark: generates reports through the full streaming path, with a
+    # throwaway report cache so every report is generated, and exports the recorded metrics.
+    import argparse
+    import tempfile
+    from llm_backends import StubBackend, make_backend
+    from report_cache import ReportCache
+    from report_generation import stream_report
+    from site_report import load_site_features, report_request
+    from site_scoring import score_districts
+    from translation_memory import TranslationMemory
+    from translations import DISTRICT_MAP_EN_KN
+
+    parser = argparse.ArgumentParser(description="Benchmarks report latency against an LLM backend and exports the metrics.")
+    parser.add_argument('--backend', default='stub', help="'stub', 'gemini' (needs GEMINI_API_KEY) or a stub server URL.")
+    parser.add_argument('--first-token-seconds', type=float, default=0.5, help="Stub backend only.")
+    parser.add_argument('--tokens-per-second', type=float, default=50, help="Stub backend only.")
+    parser.add_argument('--languages', nargs='+', choices=['en', 'kn'], default=['en', 'kn'])
+    parser.add_argument('--districts', nargs='+', default=None, help="Subset of districts (default: all).")
+    parser.add_argument('--output', default=METRICS_PATH, help="CSV file the metrics are appended to.")
+    args = parser.parse_args()
+
+    if args.backend == 'stub':
+        backend = StubBackend(args.first_token_seconds, args.tokens_per_second)
+    else:
+        backend = make_backend(args.backend, os.environ.get('GEMINI_API_KEY'))
+    recorder = LatencyRecorder(args.output)
+    # An in-memory translation memory shared by the run, so later reports show its savings
+    translation_memory = TranslationMemory(path=None)
+    features = load_site_features()
+    district_scores = score_districts(features)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for district in args.districts or list(DISTRICT_MAP_EN_KN):
+            request = report_request(district, features, district_scores=district_scores)
+            for language in args.languages:
+                # A fresh cache per report, so Kannada does not reuse the English just generated
+                report_cache = ReportCache(os.path.join(cache_dir, f'{district}-{language}'))
+                for _ in stream_report(request, language, backend, report_cache, recorder, translation_memory):
+                    pass
+    print(summarize(args.output).to_string(float_format='{:.3f}'.format))
+    if 'kn' in args.languages:
+        print("Translation memory: " + ", ".join(f"{name} {count}" for name, count in translation_memory.stats.items()))
+    print(f"Metrics appended to '{args.output}'")
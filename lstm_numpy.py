@@ -0,0 +1,162 @@
+import numpy as np
+
+
+# --- Weight Extraction ---
+def extract_keras_weights(model):
+    """
+    Pulls the weights of a Sequential LSTM stack + Dense head into a dict of float32 arrays.
+
+    Only `model.layers` and `get_weights()` are used, so this does not import TensorFlow itself.
+    """
+    arrays = {}
+    lstm_index = 0
+    for layer in model.layers:
+        weights = [np.asarray(w, dtype=np.float32) for w in layer.get_weights()]
+        if len(weights) == 3:
+            kernel, recurrent_kernel, bias = weights
+            arrays[f'lstm_{lstm_index}_kernel'] = kernel
+            arrays[f'lstm_{lstm_index}_recurrent_kernel'] = recurrent_kernel
+            arrays[f'lstm_{lstm_index}_bias'] = bias
+            lstm_index += 1
+        elif len(weights) == 2:
+            arrays['dense_kernel'], arrays['dense_bias'] = weights
+        else:
+            raise ValueError(f"Unsupported layer '{layer.name}' with {len(weights)} weight arrays.")
+    return arrays
+
+
+# --- Forward Pass ---
+def _gate_affine(units):
+    """
+    Per-column scale and shift for the packed i/f/c/o gates.
+
+    sigmoid(z) == 0.5 * tanh(0.5 * z) + 0.5, so scaling the i/f/o columns of the weights by 0.5
+    lets one tanh cover all four gates; tanh(z) * scale + shift then finishes the sigmoids and
+    leaves the cell candidate column untouched.
+    """
+    scale = np.full(4 * units, 0.5, dtype=np.float32)
+    shift = np.full(4 * units, 0.5, dtype=np.float32)
+    scale[2 * units:3 * units] = 1.0
+    shift[2 * units:3 * units] = 0.0
+    return scale, shift
+
+
+class NumpyLSTMForecaster:
+    """
+    Pure-NumPy inference for the stacked LSTM(50) -> LSTM(50) -> Dense(4) forecaster.
+
+    Matches Keras' LSTM cell (sigmoid gates, tanh activations, gate order i/f/c/o). The
+    inner 0.5 of the tanh-form sigmoid is folded into the weights at load time, so each
+    time step needs a single tanh over all four gates.
+    """
+
+    def __init__(self, weights):
+        self.layers = []
+        index = 0
+        while f'lstm_{index}_kernel' in weights:
+            kernel = weights[f'lstm_{index}_kernel']
+            recurrent_kernel = weights[f'lstm_{index}_recurrent_kernel']
+            bias = weights[f'lstm_{index}_bias']
+            units = recurrent_kernel.shape[0]
+            scale, _ = _gate_affine(units)
+            self.layers.append((kernel * scale, recurrent_kernel * scale, bias * scale, units))
+            index += 1
+        if not self.layers:
+            raise ValueError("Weight file does not contain any LSTM layers.")
+        self.dense_kernel = weights['dense_kernel']
+        self.dense_bias = weights['dense_bias']
+        self.n_features = self.layers[0][0].shape[0]
+        self.n_outputs = self.dense_kernel.shape[1]
+        # Direct multi-horizon models predict the next `output_horizon` days in one pass
+        self.output_horizon = self.n_outputs // self.n_features
+
+    @staticmethod
+    def _run_layer(projected_inputs, recurrent_kernel, units, return_sequences):
+        # projected_inputs: [batch, timesteps, 4 * units], already includes x @ W + b
+        batch, timesteps, _ = projected_inputs.shape
+        gate_scale, gate_shift = _gate_affine(units)
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        gates = np.empty((batch, 4 * units), dtype=np.float32)
+        outputs = np.empty((batch, timesteps, units), dtype=np.float32) if return_sequences else None
+        i, f, g, o = (gates[:, k * units:(k + 1) * units] for k in range(4))
+        for t in range(timesteps):
+            np.matmul(h, recurrent_kernel, out=gates)
+            gates += projected_inputs[:, t]
+            np.tanh(gates, out=gates)
+            gates *= gate_scale
+            gates += gate_shift
+            c *= f
+            c += i * g
+            h = o * np.tanh(c)
+            if return_sequences:
+                outputs[:, t] = h
+        return outputs if return_sequences else h
+
+    def predict(self, batch):
+        """
+        Vectorized forward pass for windows of shape [batch, timesteps, n_features]. Returns
+        [batch, output_horizon * n_features], the predicted days concatenated in order.
+        """
+        x = np.asarray(batch, dtype=np.float32)
+        last = len(self.layers) - 1
+        for index, (kernel, recurrent_kernel, bias, units) in enumerate(self.layers):
+            x = self._run_layer(x @ kernel + bias, recurrent_kernel, units, return_sequences=index < last)
+        return x @ self.dense_kernel + self.dense_bias
+
+    def rollout(self, last_sequence, steps, noise_std=None, rng=None):
+        """
+        Autoregressively predicts `steps` days after `last_sequence`, `output_horizon` days per
+        forward pass.
+
+        `last_sequence` is [sequence_length, n_features], or [batch, sequence_length, n_features]
+        to roll many paths forward together as one batched tensor. With `noise_std` (per feature,
+        in scaled units) every prediction is perturbed by Gaussian noise before it is fed back,
+        which turns the batch into Monte Carlo sample paths.
+        """
+        return next(self.iter_rollout(last_sequence, steps, chunk_size=steps, noise_std=noise_std, rng=rng))
+
+    def iter_rollout(self, last_sequence, steps, chunk_size, noise_std=None, rng=None):
+        """
+        Same as `rollout`, but yields the predictions in chunks of `chunk_size` days as soon as
+        each chunk is complete (the last chunk may be shorter).
+
+        The first layer's input projection of every day is computed once, when that day enters
+        the buffer, and reused by all of the windows that contain it.
+        """
+        last_sequence = np.asarray(last_sequence, dtype=np.float32)
+        single = last_sequence.ndim == 2
+        if single:
+            last_sequence = last_sequence[np.newaxis]
+        batch, sequence_length, _ = last_sequence.shape
+        if noise_std is not None:
+            noise_std = np.asarray(noise_std, dtype=np.float32)
+            rng = rng or np.random.default_rng()
+
+        kernel, _, bias, units = self.layers[0]
+        buffer = np.empty((batch, sequence_length + steps, self.n_features), dtype=np.float32)
+        projected = np.empty((batch, sequence_length + steps, 4 * units), dtype=np.float32)
+        buffer[:, :sequence_length] = last_sequence
+        projected[:, :sequence_length] = buffer[:, :sequence_length] @ kernel + bias
+
+        horizon = self.output_horizon
+        predicted = chunk_start = 0
+        while predicted < steps:
+            start = sequence_length + predicted
+            x = projected[:, predicted:start]
+            for index, (kernel_n, recurrent_kernel, bias_n, units_n) in enumerate(self.layers):
+                if index > 0:
+                    x = x @ kernel_n + bias_n
+                x = self._run_layer(x, recurrent_kernel, units_n, return_sequences=index < len(self.layers) - 1)
+            block = (x @ self.dense_kernel + self.dense_bias).reshape(batch, horizon, self.n_features)[:, :steps - predicted]
+            if noise_std is not None:
+                block += rng.standard_normal(block.shape, dtype=np.float32) * noise_std
+            end = start + block.shape[1]
+            buffer[:, start:end] = block
+            projected[:, start:end] = (block.reshape(-1, self.n_features) @ kernel + bias).reshape(batch, end - start, -1)
+            predicted += block.shape[1]
+            while predicted - chunk_start >= chunk_size or (predicted == steps and chunk_start < steps):
+                chunk_end = min(chunk_start + chunk_size, steps)
+                chunk = buffer[:, sequence_length + chunk_start:sequence_length + chunk_end]
+                chunk_start = chunk_end
+                yield chunk[0] if single else chunk
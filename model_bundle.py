@@ -0,0 +1,131 @@
+import glob
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+import numpy as np
+from file_hashing import file_sha256
+from lstm_numpy import NumpyLSTMForecaster
+
+# --- Bundle Layout ---
+# A bundle is one .npz file holding the LSTM/Dense weights (same keys as lstm_numpy),
+# the fitted MinMaxScaler parameters and a JSON metadata record. Bundles are never
+# overwritten: each save writes the next version number.
+BUNDLE_DIR = 'model/bundles'
+BUNDLE_PREFIX = 'fab_lstm'
+BUNDLE_FORMAT_VERSION = 1
+_VERSION_PATTERN = re.compile(rf'{BUNDLE_PREFIX}_v(\d+)\.npz$')
+
+
+def data_fingerprint(values):
+    """SHA-256 of a numeric array's values, independent of how the CSV was formatted."""
+    return hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()
+
+
+class ModelBundle:
+    """A loaded bundle: NumPy forecaster, persisted scaler and training metadata."""
+
+    def __init__(self, path, weights, scaler_min, scaler_scale, metadata):
+        self.path = path
+        self.metadata = metadata
+        self.weights = weights
+        self.forecaster = NumpyLSTMForecaster(weights)
+        self.scaler_min = scaler_min
+        self.scaler_scale = scaler_scale
+        self.sha256 = file_sha256(path)
+
+    @property
+    def version(self):
+        return self.metadata['version']
+
+    @property
+    def feature_columns(self):
+        return self.metadata['feature_columns']
+
+    @property
+    def sequence_length(self):
+        return self.metadata['sequence_length']
+
+    def scaler(self):
+        """A fitted MinMaxScaler equivalent to the persisted one, e.g. for incremental training."""
+        from sklearn.preprocessing import MinMaxScaler
+
+        scaler = MinMaxScaler(feature_range=(0, 1))
+        scaler.scale_ = np.asarray(self.scaler_scale, dtype=np.float64)
+        scaler.min_ = np.asarray(self.scaler_min, dtype=np.float64)
+        scaler.data_range_ = 1.0 / scaler.scale_
+        scaler.data_min_ = -scaler.min_ * scaler.data_range_
+        scaler.data_max_ = scaler.data_min_ + scaler.data_range_
+        scaler.n_features_in_ = len(scaler.scale_)
+        scaler.n_samples_seen_ = self.metadata['training_rows']
+        return scaler
+
+    def scale(self, values):
+        """Same arithmetic as MinMaxScaler.transform with the scaler fitted at training time."""
+        return np.asarray(values, dtype=np.float64) * self.scaler_scale + self.scaler_min
+
+    def inverse_scale(self, scaled_values):
+        """Same arithmetic as MinMaxScaler.inverse_transform."""
+        return (np.asarray(scaled_values, dtype=np.float64) - self.scaler_min) / self.scaler_scale
+
+
+def bundle_versions(directory=BUNDLE_DIR):
+    """Returns {version: path} for every bundle in `directory`."""
+    versions = {}
+    for path in glob.glob(os.path.join(directory, f'{BUNDLE_PREFIX}_v*.npz')):
+        match = _VERSION_PATTERN.search(os.path.basename(path))
+        if match:
+            versions[int(match.group(1))] = path
+    return versions
+
+
+def latest_bundle_path(directory=BUNDLE_DIR):
+    versions = bundle_versions(directory)
+    if not versions:
+        raise FileNotFoundError(f"No model bundle found in '{directory}'.")
+    return versions[max(versions)]
+
+
+def save_bundle(weights, scaler, feature_columns, sequence_length, training_rows, training_data_sha256, directory=BUNDLE_DIR, extra_metadata=None):
+    """
+    Writes a new bundle version and returns its path.
+
+    `weights` uses the lstm_numpy key layout and `scaler` is a fitted MinMaxScaler;
+    `training_data_sha256` is the data_fingerprint of the raw training features.
+    """
+    os.makedirs(directory, exist_ok=True)
+    versions = bundle_versions(directory)
+    version = max(versions) + 1 if versions else 1
+    metadata = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'feature_columns': list(feature_columns),
+        'sequence_length': int(sequence_length),
+        'training_rows': int(training_rows),
+        'training_data_sha256': training_data_sha256,
+        'lstm_units': [int(weights[key].shape[0]) for key in sorted(weights) if key.endswith('_recurrent_kernel')],
+        'output_horizon': int(weights['dense_kernel'].shape[1] // weights['lstm_0_kernel'].shape[0]),
+    }
+    metadata.update(extra_metadata or {})
+    path = os.path.join(directory, f'{BUNDLE_PREFIX}_v{version:04d}.npz')
+    np.savez_compressed(
+        path,
+        scaler_min=np.asarray(scaler.min_, dtype=np.float64),
+        scaler_scale=np.asarray(scaler.scale_, dtype=np.float64),
+        metadata=np.array(json.dumps(metadata)),
+        **weights,
+    )
+    return path
+
+
+def load_bundle(path=None):
+    """Loads the given bundle, or the latest version in BUNDLE_DIR."""
+    path = path or latest_bundle_path()
+    with np.load(path) as f:
+        metadata = json.loads(str(f['metadata']))
+        if metadata.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format {metadata.get('format_version')} in '{path}'.")
+        weights = {key: f[key].astype(np.float32) for key in f.files if key.startswith(('lstm_', 'dense_'))}
+        return ModelBundle(path, weights, f['scaler_min'], f['scaler_scale'], metadata)
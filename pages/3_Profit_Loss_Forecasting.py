@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
+import sys
+sys.path.append('.')
+from forecasting import DAYS_PER_YEAR, ForecastJob, aggregate_yearly, simulate_forecast_paths
+from model_bundle import load_bundle, data_fingerprint
+from forecast_cache import ForecastCache, forecast_key
+from forecast_service import iter_forecast_years_shared
+from pnl import project_pnl, break_even_year, scenario_sweep, tornado_sensitivities
 
 # --- Page Security ---
 st.set_page_config(layout="wide", initial_sidebar_state="expanded")
@@ -12,67 +17,92 @@ if st.session_state.get("user_type") != "gov":
     st.stop()
 
 # --- AI Model Loading ---
-# Use caching to load the model only once
+# Use caching to load the model bundle only once. Inference runs on the pure-NumPy
+# backend with the scaler fitted at training time, so this page never imports TensorFlow.
 @st.cache_resource
 def load_ai_model():
     try:
-        model = load_model("model/fab_lstm_forecaster.h5")
-        return model
+        return load_bundle()
     except (FileNotFoundError, IOError):
         st.error("Trained AI model not found. Please run `train_forecasting_model.py` first to create the model.")
         return None
 
 model = load_ai_model()
 
+# One cache per process, shared by every session. The forecast depends only on the model,
+# the historical data and the horizon, so slider changes never invalidate it.
+@st.cache_resource
+def load_forecast_cache():
+    return ForecastCache()
+
+forecast_cache = load_forecast_cache()
+
 # --- AI Forecasting Function ---
-def forecast_with_ai(df, years=5):
-    """Uses the trained LSTM model to project future values."""
+def forecast_with_ai(df, years=5, data_hash=None):
+    """
+    Uses the trained LSTM model to project future values.
     
-    # Prepare the data and scaler (must be identical to training)
-    data = df[['average_selling_price_usd', 'silicon_wafer_cost_usd', 'energy_cost_per_kwh_usd', 'total_daily_labor_cost_usd']].values
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(data)
+    Yields (yearly forecasts so far, completed years) each time another forecast year is
+    ready, so the page can redraw while the rollout runs on a background job. A finished
+    forecast is stored in the forecast cache and later calls yield it at once.
+    """
     
-    sequence_length = 60
+    horizon_days = DAYS_PER_YEAR * years
+    data_hash = data_hash or data_fingerprint(df[model.feature_columns].values)
+    key = forecast_key(model.sha256, data_hash, horizon_days)
     
-    # Get the last sequence from the historical data
-    last_sequence = scaled_data[-sequence_length:]
-    current_batch = last_sequence.reshape(1, sequence_length, 4)
+    predicted_values = forecast_cache.get(key)
+    if predicted_values is not None:
+        yield aggregate_yearly(predicted_values, years, columns=model.feature_columns), years
+        return
     
-    future_predictions = []
+    # The job lives in the session, so a rerun (e.g. a slider move) reattaches to it instead of restarting
+    key_and_job = st.session_state.get('forecast_job')
+    if key_and_job is None or key_and_job[0] != key or (key_and_job[1].cancelled and st.session_state.get('forecast_restart')):
+        if key_and_job is not None:
+            key_and_job[1].cancel()
+        # Served by the shared forecasting process when it is running, otherwise in-process
+        key_and_job = (key, ForecastJob(model, df[model.feature_columns].values, years, source=iter_forecast_years_shared))
+        st.session_state['forecast_job'] = key_and_job
+    st.session_state['forecast_restart'] = False
+    job = key_and_job[1]
+    
+    completed_years = 0
+    while True:
+        completed_years = job.wait(completed_years, timeout=1.0)
+        if completed_years:
+            yield aggregate_yearly(job.daily_values(), completed_years, columns=model.feature_columns), completed_years
+        if job.finished:
+            break
+    
+    if job.error is not None:
+        raise job.error
+    if completed_years == years:
+        forecast_cache.put(key, job.daily_values())
+
+def forecast_uncertainty(df, years=5, samples=100, seed=0, data_hash=None):
+    """Runs `samples` perturbed rollouts as one batch and returns yearly averages per sample."""
     
-    # Predict for 5 years (365 * 5 days)
-    for i in range(365 * years):
-        # Get the prediction for the next day
-        next_prediction = model.predict(current_batch, verbose=0)
-        future_predictions.append(next_prediction[0])
-        # Update the batch: remove the first day and add the new prediction
-        current_batch = np.append(current_batch[:, 1:, :], [[next_prediction[0]]], axis=1)
-        
-    # Inverse transform to get the actual values
-    predicted_values = scaler.inverse_transform(future_predictions)
+    data_hash = data_hash or data_fingerprint(df[model.feature_columns].values)
+    key = forecast_key(model.sha256, data_hash, DAYS_PER_YEAR * years, variant=f'monte_carlo:{samples}:{seed}')
     
-    # Aggregate daily predictions into yearly averages
-    yearly_forecasts = {}
-    df_preds = pd.DataFrame(predicted_values, columns=['average_selling_price_usd', 'silicon_wafer_cost_usd', 'energy_cost_per_kwh_usd', 'total_daily_labor_cost_usd'])
+    def run_simulation():
+        paths = simulate_forecast_paths(model, df[model.feature_columns].values, years, samples, seed=seed)
+        yearly = aggregate_yearly(paths, years, columns=model.feature_columns)
+        return np.stack([yearly[col] for col in model.feature_columns], axis=-1)
     
-    for i, year in enumerate(range(1, years + 1)):
-        yearly_data = df_preds.iloc[i*365 : (i+1)*365]
-        for col in yearly_data.columns:
-            if col not in yearly_forecasts:
-                yearly_forecasts[col] = []
-            yearly_forecasts[col].append(yearly_data[col].mean())
-            
-    # Convert lists to numpy arrays
-    for col in yearly_forecasts:
-        yearly_forecasts[col] = np.array(yearly_forecasts[col])
-        
-    return yearly_forecasts
+    yearly_samples = forecast_cache.get_or_compute(key, run_simulation)
+    return {col: yearly_samples[..., i] for i, col in enumerate(model.feature_columns)}
 
 # --- Load the Dataset ---
+@st.cache_data
+def load_historical_data(feature_columns):
+    df = pd.read_csv("data/synthetic_fab_data.csv")
+    df['date'] = pd.to_datetime(df['date'])
+    return df, data_fingerprint(df[feature_columns].values)
+
 try:
-    df_historical = pd.read_csv("data/synthetic_fab_data.csv")
-    df_historical['date'] = pd.to_datetime(df_historical['date'])
+    df_historical, historical_data_hash = load_historical_data(model.feature_columns if model is not None else [])
 except FileNotFoundError:
     st.error("Dataset not found. Please run `generate_synthetic_data.py` first.")
     st.stop()
@@ -80,42 +110,43 @@ except FileNotFoundError:
 # --- Page UI ---
 st.title("🧠 AI-Powered Profit & Loss Forecasting")
 st.markdown("---")
-st.info("This tool uses a trained LSTM neural network to project a 5-year financial forecast based on historical data and your operational assumptions.")
+
+if model is not None:
+    st.sidebar.caption(f"Model bundle v{model.version} · trained {model.metadata['created_at'][:10]} on {model.metadata['training_rows']} rows")
 
 st.sidebar.header("Financial & Operational Assumptions")
 initial_capex = st.sidebar.slider("Initial CAPEX Investment (Billion USD)", 5.0, 20.0, 10.0, 0.5)
 capacity_wpm = st.sidebar.slider("Production Capacity (Wafer Starts Per Month)", 10000, 100000, 50000, 5000)
 chips_per_wafer = st.sidebar.slider("Average Chips per Wafer", 100, 1000, 400, 10)
+horizon_years = st.sidebar.slider("Forecast Horizon (Years)", 1, 20, 5)
+
+st.info(f"This tool uses a trained LSTM neural network to project a {horizon_years}-year financial forecast based on historical data and your operational assumptions.")
 
 if model is not None and st.sidebar.button("Run AI Forecast", type="primary", use_container_width=True):
-    with st.spinner("Running AI model to generate 5-year forecast... This may take a moment."):
-        # --- Calculations ---
-        years = np.arange(1, 6)
-        forecasts = forecast_with_ai(df_historical)
-        
-        annual_chip_production = capacity_wpm * 12 * chips_per_wafer
-        annual_wafer_production = capacity_wpm * 12
-        
-        annual_revenue = (annual_chip_production * forecasts['average_selling_price_usd']) / 1_000_000_000
-        annual_material_cost = (annual_wafer_production * forecasts['silicon_wafer_cost_usd']) / 1_000_000_000
-        annual_labor_cost = (forecasts['total_daily_labor_cost_usd'] * 365) / 1_000_000_000
-        annual_energy_cost = (500_000_000 * forecasts['energy_cost_per_kwh_usd']) / 1_000_000_000
-        
-        annual_opex = annual_material_cost + annual_labor_cost + annual_energy_cost
-        depreciation = initial_capex / 5
-        annual_profit_loss = annual_revenue - annual_opex - depreciation
-        cumulative_profit_loss = np.cumsum(annual_profit_loss)
-
-        # --- Display Results ---
-        df_forecast = pd.DataFrame({
-            "Year": years,
-            "Projected Revenue (Billion USD)": annual_revenue,
-            "Projected OPEX (Billion USD)": annual_opex,
-            "Annual Profit/Loss (Billion USD)": annual_profit_loss,
-            "Cumulative Profit/Loss (Billion USD)": cumulative_profit_loss
-        })
-
-    st.header("5-Year Financial Projections (Generated by AI)")
+    st.session_state['forecast_requested'] = True
+    st.session_state['forecast_restart'] = True
+
+def cancel_forecast():
+    # Runs before the next script run: the click stops the redraw loop, this stops the worker
+    key_and_job = st.session_state.get('forecast_job')
+    if key_and_job is not None:
+        key_and_job[1].cancel()
+
+cancel_slot = st.sidebar.empty()
+
+def show_projection(forecasts, completed_years):
+    """Draws the chart, table and key metrics for the forecast years completed so far."""
+    years = np.arange(1, completed_years + 1)
+    pnl = project_pnl(forecasts, initial_capex, capacity_wpm, chips_per_wafer)
+    df_forecast = pd.DataFrame({
+        "Year": years,
+        "Projected Revenue (Billion USD)": pnl['revenue'],
+        "Projected OPEX (Billion USD)": pnl['opex'],
+        "Annual Profit/Loss (Billion USD)": pnl['profit_loss'],
+        "Cumulative Profit/Loss (Billion USD)": pnl['cumulative_profit_loss']
+    })
+
+    st.header(f"{horizon_years}-Year Financial Projections (Generated by AI)")
     st.subheader("Financial Performance Over Time")
     st.line_chart(df_forecast, x="Year", y=["Projected Revenue (Billion USD)", "Projected OPEX (Billion USD)", "Cumulative Profit/Loss (Billion USD)"])
 
@@ -126,14 +157,113 @@ if model is not None and st.sidebar.button("Run AI Forecast", type="primary", us
     col1, col2 = st.columns(2)
     with col1:
         try:
-            break_even_year = df_forecast[df_forecast["Cumulative Profit/Loss (Billion USD)"] >= 0]["Year"].iloc[0]
-            st.success(f"**Projected Break-Even Point:** Year {break_even_year}")
+            break_even_point = df_forecast[df_forecast["Cumulative Profit/Loss (Billion USD)"] >= 0]["Year"].iloc[0]
+            st.success(f"**Projected Break-Even Point:** Year {break_even_point}")
         except IndexError:
-            st.warning("**Warning:** The project does not reach profitability within the 5-year forecast period.")
+            st.warning(f"**Warning:** The project does not reach profitability within the {completed_years}-year forecast period.")
 
     with col2:
         total_profit = df_forecast["Cumulative Profit/Loss (Billion USD)"].iloc[-1]
-        st.metric("Total 5-Year Net Result (Billion USD)", f"{total_profit:.2f}")
+        st.metric(f"Total {completed_years}-Year Net Result (Billion USD)", f"{total_profit:.2f}")
+
+# Once requested, the forecast stays on screen: moving a slider reruns only the financial
+# math, because the LSTM rollout is served from the forecast cache (or the running job).
+if model is not None and st.session_state.get('forecast_requested'):
+    progress_slot = st.empty()
+    projection = st.empty()
+    forecasts, completed_years = None, 0
+    cancel_shown = False
+    with st.spinner(f"Running AI model to generate {horizon_years}-year forecast..."):
+        for forecasts, completed_years in forecast_with_ai(df_historical, years=horizon_years, data_hash=historical_data_hash):
+            if completed_years < horizon_years:
+                progress_slot.progress(completed_years / horizon_years, text=f"Forecast year {completed_years} of {horizon_years} complete...")
+                if not cancel_shown and not st.session_state['forecast_job'][1].cancelled:
+                    cancel_slot.button("Cancel Forecast", on_click=cancel_forecast, use_container_width=True)
+                    cancel_shown = True
+            with projection.container():
+                show_projection(forecasts, completed_years)
+    progress_slot.empty()
+    cancel_slot.empty()
+
+if model is not None and st.session_state.get('forecast_requested') and completed_years < horizon_years:
+    if completed_years:
+        st.warning(f"Forecast cancelled after {completed_years} of {horizon_years} years. Click 'Run AI Forecast' to start again.")
+    else:
+        st.warning("Forecast cancelled. Click 'Run AI Forecast' to start again.")
+
+elif model is not None and st.session_state.get('forecast_requested'):
+    years = np.arange(1, horizon_years + 1)
+
+    # --- Forecast Uncertainty ---
+    # Many noisy rollouts run as one batch; each sample path goes through the same P&L math
+    with st.expander("🎲 Forecast Uncertainty (Monte Carlo)"):
+        mc_samples = st.select_slider("Sample paths", options=[20, 50, 100, 200, 300], value=100)
+        if st.button("Run Uncertainty Analysis"):
+            st.session_state['uncertainty_samples'] = mc_samples
+
+        if st.session_state.get('uncertainty_samples'):
+            samples = st.session_state['uncertainty_samples']
+            with st.spinner(f"Simulating {samples} forecast paths in one batch..."):
+                mc_forecasts = forecast_uncertainty(df_historical, years=horizon_years, samples=samples, data_hash=historical_data_hash)
+            mc_pnl = project_pnl(mc_forecasts, initial_capex, capacity_wpm, chips_per_wafer)
+            revenue_bands, opex_bands, cumulative_bands = (np.percentile(mc_pnl[name], [10, 50, 90], axis=0) for name in ('revenue', 'opex', 'cumulative_profit_loss'))
+            df_bands = pd.DataFrame({"Year": years})
+            for label, bands in (("Revenue", revenue_bands), ("OPEX", opex_bands), ("Cumulative P&L", cumulative_bands)):
+                for percentile, band in zip(("P10", "P50", "P90"), bands):
+                    df_bands[f"{label} {percentile}"] = band
+            st.subheader(f"P10 / P50 / P90 Bands ({samples} sample paths)")
+            st.line_chart(df_bands, x="Year", y=["Revenue P10", "Revenue P50", "Revenue P90", "OPEX P10", "OPEX P50", "OPEX P90"])
+            st.dataframe(df_bands.style.format("{:.2f}"))
+
+            mc_break_even = break_even_year(mc_pnl['cumulative_profit_loss'])
+            mc_col1, mc_col2 = st.columns(2)
+            with mc_col1:
+                st.metric("Probability of Break-Even", f"{np.mean(~np.isnan(mc_break_even)):.0%}")
+            with mc_col2:
+                st.metric("P10 / P90 Total Net Result (Billion USD)", f"{cumulative_bands[0][-1]:.2f} / {cumulative_bands[2][-1]:.2f}")
+
+    # --- Scenario Sweep ---
+    # Evaluates a whole grid of assumptions against the same cached forecast in one NumPy pass
+    with st.expander("📊 Scenario Sweep & Sensitivity Analysis"):
+        sweep_col1, sweep_col2, sweep_col3 = st.columns(3)
+        with sweep_col1:
+            capex_range = st.slider("CAPEX range (Billion USD)", 5.0, 20.0, (5.0, 20.0), 0.5)
+        with sweep_col2:
+            wpm_range = st.slider("Wafer starts per month range", 10000, 100000, (10000, 100000), 5000)
+        with sweep_col3:
+            chips_range = st.slider("Chips per wafer range", 100, 1000, (100, 1000), 10)
+        grid_points = st.select_slider("Grid points per input", options=[5, 10, 20, 30, 40, 50], value=20)
+
+        df_sweep = scenario_sweep(
+            forecasts,
+            np.linspace(*capex_range, grid_points),
+            np.linspace(*wpm_range, grid_points),
+            np.linspace(*chips_range, grid_points),
+        )
+        breaks_even = df_sweep["break_even_year"].notna()
+        st.write(f"Evaluated **{len(df_sweep):,}** scenarios: **{breaks_even.mean():.0%}** break even within the forecast period.")
+
+        sweep_col1, sweep_col2 = st.columns(2)
+        with sweep_col1:
+            st.subheader("Break-Even Year Distribution")
+            break_even_labels = df_sweep["break_even_year"].map(lambda year: "Never" if np.isnan(year) else f"Year {int(year)}")
+            st.bar_chart(break_even_labels.value_counts().sort_index())
+        with sweep_col2:
+            st.subheader("Tornado: Total Net Result Sensitivity")
+            df_tornado = tornado_sensitivities(
+                forecasts,
+                base={'initial_capex': initial_capex, 'capacity_wpm': capacity_wpm, 'chips_per_wafer': chips_per_wafer},
+                ranges={'initial_capex': capex_range, 'capacity_wpm': wpm_range, 'chips_per_wafer': chips_range},
+            )
+            df_tornado["Change at low"] = df_tornado["result_at_low"] - df_tornado["base_result"]
+            df_tornado["Change at high"] = df_tornado["result_at_high"] - df_tornado["base_result"]
+            st.bar_chart(df_tornado, x="input", y=["Change at low", "Change at high"], horizontal=True)
+
+        st.subheader("Best Scenarios by Total Net Result")
+        st.dataframe(df_sweep.nlargest(20, "cumulative_profit_loss").style.format("{:.2f}"))
+
+    stats = forecast_cache.stats
+    st.sidebar.caption(f"Forecast cache: {stats['memory_hits'] + stats['disk_hits']} hits · {stats['misses']} misses · {stats['evictions']} evictions")
 
 elif model is None:
     pass # Error is already shown by the load_ai_model function
@@ -3,7 +3,8 @@ import sys
 sys.path.append('.') 
 
 # --- THIS IS THE CORRECTED IMPORT LINE ---
-from analysis import load_data, get_llm_analysis_and_stream, create_html_report
+from analysis import load_district_features, get_llm_analysis_and_stream, create_html_report
+from site_scoring import DEFAULT_WEIGHTS, score_districts
 from translations import LANG_STRINGS, DISTRICT_MAP_EN_KN, DISTRICT_MAP_KN_EN
 import os
 
@@ -34,13 +35,26 @@ st.session_state['lang'] = 'en' if selected_lang_display == 'English' else 'kn'
 lang = st.session_state['lang'] 
 
 # Load data (cached)
-rainfall_data, boilers_data, roads_data = load_data()
+district_features = load_district_features()
 
-if all(df is not None for df in [rainfall_data, boilers_data, roads_data]):
+if district_features is not None:
     st.header(LANG_STRINGS['site_selection_header'][lang])
     st.info(LANG_STRINGS['site_selection_info'][lang])
 
-    available_districts_en = [dist for dist in sorted(rainfall_data['District'].unique()) if dist in DISTRICT_MAP_EN_KN]
+    available_districts_en = [dist for dist in district_features.dropna(subset=['annual_rainfall_mm'])['district'] if dist in DISTRICT_MAP_EN_KN]
+
+    # Rule-based ranking of every district; recomputed in milliseconds whenever a weight changes
+    with st.expander(LANG_STRINGS['ranking_header'][lang]):
+        st.caption(LANG_STRINGS['ranking_info'][lang])
+        weight_columns = st.columns(len(DEFAULT_WEIGHTS))
+        weights = {
+            name: column.slider(LANG_STRINGS['weight_labels'][lang][name], 0.0, 3.0, default, 0.5)
+            for column, (name, default) in zip(weight_columns, DEFAULT_WEIGHTS.items())
+        }
+        district_scores = score_districts(district_features, weights)
+        if lang == 'kn':
+            district_scores['district'] = district_scores['district'].map(DISTRICT_MAP_EN_KN).fillna(district_scores['district'])
+        st.dataframe(district_scores.set_index('rank'), use_container_width=True)
     
     if lang == 'kn':
         display_districts = [DISTRICT_MAP_EN_KN[dist] for dist in available_districts_en]
@@ -70,11 +84,8 @@ if all(df is not None for df in [rainfall_data, boilers_data, roads_data]):
                 full_report_text = ""
                 placeholder = st.empty()
                 # Calling the new function name
-                for chunk in get_llm_analysis_and_stream(district_en, rainfall_data, boilers_data, roads_data, language=lang):
-                    if chunk == "<STOP_AND_CLEAR>":
-                        full_report_text = "" # Reset for translation
-                    else:
-                        full_report_text += chunk
+                for chunk in get_llm_analysis_and_stream(district_en, district_features, language=lang, weights=weights):
+                    full_report_text += chunk
                     placeholder.markdown(full_report_text + " ▌") # Add a blinking cursor effect
                 placeholder.markdown(full_report_text) # Show final report
                 return full_report_text
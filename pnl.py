@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+# --- Financial Assumptions ---
+ANNUAL_ENERGY_KWH = 500_000_000
+DEPRECIATION_YEARS = 5
+BILLION = 1_000_000_000
+
+SCENARIO_INPUTS = ['initial_capex', 'capacity_wpm', 'chips_per_wafer']
+FORECAST_DRIVERS = {
+    'average_selling_price_usd': "Average Selling Price",
+    'silicon_wafer_cost_usd': "Silicon Wafer Cost",
+    'energy_cost_per_kwh_usd': "Energy Cost",
+    'total_daily_labor_cost_usd': "Labor Cost",
+}
+
+
+def project_pnl(forecasts, initial_capex, capacity_wpm, chips_per_wafer):
+    """
+    Annual P&L in billion USD for one or many scenarios.
+
+    The scenario inputs may be scalars or equally shaped arrays of shape S; the yearly
+    forecast arrays have shape [Y] (shared) or S + [Y] (per scenario). Every returned
+    array has shape S + [Y], so thousands of scenarios cost one broadcasted pass.
+    """
+    initial_capex, capacity_wpm, chips_per_wafer = (np.asarray(x, dtype=np.float64)[..., np.newaxis] for x in (initial_capex, capacity_wpm, chips_per_wafer))
+
+    annual_wafer_production = capacity_wpm * 12
+    annual_chip_production = annual_wafer_production * chips_per_wafer
+
+    annual_revenue = (annual_chip_production * forecasts['average_selling_price_usd']) / BILLION
+    annual_material_cost = (annual_wafer_production * forecasts['silicon_wafer_cost_usd']) / BILLION
+    annual_labor_cost = (forecasts['total_daily_labor_cost_usd'] * 365) / BILLION
+    annual_energy_cost = (ANNUAL_ENERGY_KWH * forecasts['energy_cost_per_kwh_usd']) / BILLION
+
+    annual_opex = annual_material_cost + annual_labor_cost + annual_energy_cost
+    # Straight-line depreciation stops once the CAPEX is written off, for horizons beyond 5 years
+    forecast_years = np.arange(1, np.shape(annual_opex)[-1] + 1)
+    depreciation = np.where(forecast_years <= DEPRECIATION_YEARS, initial_capex / DEPRECIATION_YEARS, 0.0)
+    annual_profit_loss = annual_revenue - annual_opex - depreciation
+    cumulative_profit_loss = np.cumsum(annual_profit_loss, axis=-1)
+    return {
+        'revenue': np.broadcast_to(annual_revenue, cumulative_profit_loss.shape),
+        'opex': np.broadcast_to(annual_opex, cumulative_profit_loss.shape),
+        'profit_loss': annual_profit_loss,
+        'cumulative_profit_loss': cumulative_profit_loss,
+    }
+
+
+def break_even_year(cumulative_profit_loss):
+    """First forecast year (1-based) with cumulative P&L >= 0, or NaN if it is never reached."""
+    reached = cumulative_profit_loss >= 0
+    return np.where(reached.any(axis=-1), reached.argmax(axis=-1) + 1, np.nan)
+
+
+# --- Scenario Sweep ---
+def scenario_sweep(forecasts, capex_values, wpm_values, chips_values):
+    """Evaluates every combination of the three input grids and returns one row per scenario."""
+    capex, wpm, chips = (grid.ravel() for grid in np.meshgrid(capex_values, wpm_values, chips_values, indexing='ij'))
+    cumulative = project_pnl(forecasts, capex, wpm, chips)['cumulative_profit_loss']
+    return pd.DataFrame({
+        'initial_capex': capex,
+        'capacity_wpm': wpm,
+        'chips_per_wafer': chips,
+        'break_even_year': break_even_year(cumulative),
+        'cumulative_profit_loss': cumulative[:, -1],
+    })
+
+
+def tornado_sensitivities(forecasts, base, ranges, driver_change=0.10):
+    """
+    One-at-a-time sensitivity of the final cumulative P&L.
+
+    `base` maps each SCENARIO_INPUTS name to its base value and `ranges` maps some of them to
+    a (low, high) pair; each forecast driver is additionally moved by +/- `driver_change`.
+    All low/high cases are evaluated together in a single broadcasted pass.
+    """
+    labels, lows, highs = [], [], []
+    inputs = {name: [] for name in SCENARIO_INPUTS}
+    driver_scale = {col: [] for col in FORECAST_DRIVERS}
+
+    def add_case(changed_input=None, value=None, changed_driver=None, factor=1.0):
+        for name in SCENARIO_INPUTS:
+            inputs[name].append(value if name == changed_input else base[name])
+        for col in FORECAST_DRIVERS:
+            driver_scale[col].append(factor if col == changed_driver else 1.0)
+
+    for name, (low, high) in ranges.items():
+        labels.append(name)
+        lows.append(low)
+        highs.append(high)
+        add_case(changed_input=name, value=low)
+        add_case(changed_input=name, value=high)
+    for col, label in FORECAST_DRIVERS.items():
+        labels.append(label)
+        lows.append(1 - driver_change)
+        highs.append(1 + driver_change)
+        add_case(changed_driver=col, factor=1 - driver_change)
+        add_case(changed_driver=col, factor=1 + driver_change)
+    add_case()  # base case is the last row
+
+    scaled_forecasts = {col: np.asarray(driver_scale[col])[:, np.newaxis] * forecasts[col] for col in FORECAST_DRIVERS}
+    final = project_pnl(scaled_forecasts, *(inputs[name] for name in SCENARIO_INPUTS))['cumulative_profit_loss'][:, -1]
+    base_result = final[-1]
+    result = pd.DataFrame({
+        'input': labels,
+        'low': lows,
+        'high': highs,
+        'result_at_low': final[0:-1:2],
+        'result_at_high': final[1:-1:2],
+    })
+    result['swing'] = (result['result_at_high'] - result['result_at_low']).abs()
+    result['base_result'] = base_result
+    return result.sort_values('swing', ascending=False).reset_index(drop=True)
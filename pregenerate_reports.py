@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from llm_backends import GeminiBackend, StubBackend
+from llm_metrics import METRICS_PATH, LatencyRecorder
+from report_cache import ReportCache
+from site_report import cache_metadata, load_site_features, report_request, request_cache_key, translation_prompt
+from translation_memory import TranslationMemory, batch_prompt, parse_batch
+from site_scoring import score_districts
+from translations import DISTRICT_MAP_EN_KN
+
+# --- Offline Report Pre-generation ---
+# Generates the English and Kannada feasibility report of every district ahead of time and
+# stores them in the report cache under the same keys the Streamlit pages look up, so the UI
+# serves them without waiting for the LLM. Requests run concurrently on asyncio (the blocking
+# LLM calls in threads), bounded by a semaphore and a token-bucket rate limit, and failed calls
+# are retried with exponential backoff. Reports already in the cache are skipped, so an
+# interrupted run resumes where it stopped; the progress file records the outcome of each report.
+PROGRESS_PATH = 'cache/pregenerate_progress.json'
+LANGUAGES = ['en', 'kn']
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, and bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Pregenerator:
+    def __init__(self, backend, report_cache, concurrency, requests_per_minute, burst, retries, backoff_seconds, progress_path,
+                 recorder=None, translation_memory=None):
+        self.backend = backend
+        self.translation_memory = translation_memory or TranslationMemory(path=None)
+        self.recorder = recorder or LatencyRecorder(path=None)
+        self.report_cache = report_cache
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(requests_per_minute / 60, burst)
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.progress_path = progress_path
+        try:
+            with open(progress_path) as f:
+                self.progress = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.progress = {}
+        self.stats = {'calls': 0, 'retries': 0}
+
+    async def _call(self, backend, prompt):
+        """One LLM call, rate limited and bounded, retried with jittered exponential backoff."""
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            async with self.semaphore:
+                self.stats['calls'] += 1
+                try:
+                    return await asyncio.to_thread(backend.generate, prompt)
+                except Exception:
+                    if attempt == self.retries:
+                        raise
+            self.stats['retries'] += 1
+            await asyncio.sleep(self.backoff_seconds * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def _record(self, request, language, status, **details):
+        self.progress[f"{request['district']}:{language}"] = {'status': status, 'model': self.backend.model_name,
+                                                             'at': time.strftime('%Y-%m-%dT%H:%M:%S'), **details}
+        os.makedirs(os.path.dirname(self.progress_path) or '.', exist_ok=True)
+        tmp_path = f'{self.progress_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.progress, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.progress_path)
+
+    async def _report(self, request, language):
+        """The cached report in `language`, generating (and caching) it and any missing English source."""
+        key = request_cache_key(request, language, self.backend.model_name)
+        report = self.report_cache.get(key)
+        if report is not None:
+            return report, False
+        if language == 'en':
+            generation = self.recorder.instrument(self.backend, 'generation', district=request['district'], language='en')
+            report = (await self._call(generation, request['prompt'])) + request['verdict_chunk']
+        else:
+            english_report, _ = await self._report(request, 'en')
+            # One batched request for all the segments of the report the translation memory does not know
+            translation = self.recorder.instrument(self.backend, 'translation', district=request['district'], language=language)
+            lines, unknown = self.translation_memory.plan(english_report, self.backend.model_name)
+            translations = parse_batch(await self._call(translation, batch_prompt(unknown)), len(unknown)) if unknown else []
+            if translations is None:
+                report = (await self._call(translation, translation_prompt(english_report))).strip()
+            else:
+                report = self.translation_memory.complete(lines, unknown, self.backend.model_name, translations)
+        self.report_cache.put(key, report, **cache_metadata(request, language, self.backend.model_name))
+        return report, True
+
+    async def _district(self, request, languages):
+        # English first: the Kannada report is translated from it
+        for language in sorted(languages, key=lambda language: language != 'en'):
+            started = time.perf_counter()
+            try:
+                _, generated = await self._report(request, language)
+            except Exception as e:
+                self._record(request, language, 'failed', error=str(e))
+                continue
+            self._record(request, language, 'generated' if generated else 'cached', seconds=round(time.perf_counter() - started, 3))
+
+    async def run(self, requests, languages):
+        await asyncio.gather(*(self._district(request, languages) for request in requests))
+
+
+def _gemini_api_key():
+    if os.environ.get('GEMINI_API_KEY'):
+        return os.environ['GEMINI_API_KEY']
+    import tomllib
+
+    with open('.streamlit/secrets.toml', 'rb') as f:
+        return tomllib.load(f)['GEMINI_API_KEY']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pre-generates the feasibility reports of every district into the report cache.")
+    parser.add_argument('--backend', choices=['gemini', 'stub'], default='gemini')
+    parser.add_argument('--languages', nargs='+', choices=LANGUAGES, default=LANGUAGES)
+    parser.add_argument('--districts', nargs='+', default=None, help="Subset of districts (default: all).")
+    parser.add_argument('--concurrency', type=int, default=4, help="Maximum LLM calls in flight.")
+    parser.add_argument('--requests-per-minute', type=float, default=15)
+    parser.add_argument('--burst', type=int, default=4, help="Token-bucket capacity.")
+    parser.add_argument('--retries', type=int, default=4)
+    parser.add_argument('--backoff', type=float, default=2.0, help="Seconds before the first retry; doubles per attempt.")
+    parser.add_argument('--stub-latency', type=float, default=0.0, help="Stub time to first token, in seconds.")
+    parser.add_argument('--stub-tokens-per-second', type=float, default=0.0)
+    parser.add_argument('--stub-failure-rate', type=float, default=0.0)
+    parser.add_argument('--progress', default=PROGRESS_PATH)
+    parser.add_argument('--metrics', default=METRICS_PATH, help="CSV file the call latencies are appended to.")
+    args = parser.parse_args()
+
+    if args.backend == 'stub':
+        backend = StubBackend(args.stub_latency, args.stub_tokens_per_second, failure_rate=args.stub_failure_rate)
+    else:
+        backend = GeminiBackend(_gemini_api_key())
+
+    features = load_site_features()
+    district_scores = score_districts(features)
+    districts = args.districts or list(DISTRICT_MAP_EN_KN)
+    requests = [report_request(district, features, district_scores=district_scores) for district in districts]
+
+    pregenerator = Pregenerator(backend, ReportCache(), args.concurrency, args.requests_per_minute, args.burst,
+                                args.retries, args.backoff, args.progress, LatencyRecorder(args.metrics), TranslationMemory())
+    started = time.perf_counter()
+    asyncio.run(pregenerator.run(requests, args.languages))
+    outcomes = [pregenerator.progress.get(f"{request['district']}:{language}", {}).get('status') for request in requests for language in args.languages]
+    print(f"{len(requests)} districts x {len(args.languages)} languages in {time.perf_counter() - started:.1f}s with '{backend.model_name}': "
+          f"{outcomes.count('generated')} generated, {outcomes.count('cached')} already cached, {outcomes.count('failed')} failed "
+          f"({pregenerator.stats['calls']} LLM calls, {pregenerator.stats['retries']} retries).")
+    print(f"Progress written to '{args.progress}'")
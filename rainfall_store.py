@@ -0,0 +1,277 @@
+import argparse
+import glob
+import json
+import os
+import numpy as np
+import pandas as pd
+from district_features import MONTH_COLUMNS, canonical_district, district_key
+from file_hashing import file_sha256
+
+# --- Rainfall Store ---
+# Daily NRSC VIC rainfall for every district and year is ingested append-only: each new file is
+# read in chunks and its days are written into one 366-slot array per (district, year), so rows
+# may arrive in any order and a re-sent day overwrites rather than double-counts. Only the
+# district-years a file touched have their aggregates (annual and monthly totals, monsoon total,
+# longest dry spell) recomputed, and only the districts it touched have their summary
+# (mean annual rainfall, monsoon share, year-over-year variability) refreshed. The daily arrays
+# are sharded per year, and only the shards of the years a file touched are rewritten. A ledger
+# of file hashes makes ingesting the same file twice a no-op; it also records each file's mtime
+# and size, so an unchanged file is recognized without being read or the store being loaded.
+STORE_DIR = 'cache/rainfall'
+CHUNK_ROWS = 100_000
+DAYS_PER_YEAR = 366  # slot 365 stays empty in non-leap years
+DRY_DAY_MM = 2.5  # IMD's rainy-day threshold
+MONSOON_MONTHS = [6, 7, 8, 9]  # southwest monsoon, June to September
+
+# First day-of-year slot of every month, for non-leap and leap years
+_MONTH_STARTS = {
+    leap: np.cumsum([0] + [pd.Period(f'{2024 if leap else 2023}-{month:02d}').days_in_month for month in range(1, 12)])
+    for leap in (False, True)
+}
+
+
+def _paths(store_dir):
+    return {name: os.path.join(store_dir, file) for name, file in
+            [('daily', 'daily'), ('years', 'years.parquet'), ('districts', 'districts.parquet'), ('ledger', 'ledger.json')]}
+
+
+def _shard_path(store_dir, year):
+    return os.path.join(_paths(store_dir)['daily'], f'{year}.npz')
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _read_ledger(store_dir):
+    try:
+        with open(_paths(store_dir)['ledger']) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_ledger(store_dir, ledger):
+    def write(path):
+        with open(path, 'w') as f:
+            json.dump(ledger, f, indent=2)
+    _replace(_paths(store_dir)['ledger'], write)
+
+
+def _already_ingested(ledger, path):
+    """True if the ledger has `path` with its current mtime and size, so hashing it can be skipped."""
+    stamp = _file_stamp(path)
+    return any(entry.get('stamps', {}).get(path) == stamp for entry in ledger.values())
+
+
+def _replace(path, write):
+    """Writes through a temporary file so readers never see a partial store."""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class RainfallStore:
+    """The daily arrays, per district-year and per district aggregates, and the ingestion ledger."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.paths = _paths(store_dir)
+        try:
+            shards = sorted(glob.glob(os.path.join(self.paths['daily'], '*.npz')))
+            if not shards:
+                raise FileNotFoundError(self.paths['daily'])
+            self.keys, daily = [], []
+            for shard in shards:
+                year = int(os.path.splitext(os.path.basename(shard))[0])
+                with np.load(shard) as arrays:
+                    self.keys.extend((key, year) for key in arrays['district_keys'].tolist())
+                    daily.append(arrays['daily'])
+            self.daily = np.concatenate(daily)
+            self.years = pd.read_parquet(self.paths['years'])
+            self.districts = pd.read_parquet(self.paths['districts'])
+            with open(self.paths['ledger']) as f:
+                self.ledger = json.load(f)
+        except FileNotFoundError:
+            self.keys, self.daily = [], np.empty((0, DAYS_PER_YEAR), dtype=np.float64)
+            self.years, self.districts, self.ledger = None, None, {}
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        # Display name of every district key; the first spelling seen is kept
+        self._names = {} if self.years is None else self.years['district'].groupby(level='district_key').first().to_dict()
+
+    def _row_indices(self, pairs):
+        """Daily-array rows of (district_key, year) pairs, growing the arrays for new pairs."""
+        new = [pair for pair in pairs if pair not in self.rows]
+        if new:
+            for pair in new:
+                self.rows[pair] = len(self.keys)
+                self.keys.append(pair)
+            self.daily = np.concatenate([self.daily, np.full((len(new), DAYS_PER_YEAR), np.nan, dtype=np.float64)])
+        return np.array([self.rows[pair] for pair in pairs], dtype=np.int64)
+
+    def add_chunk(self, chunk):
+        """Writes one chunk of (District, Date, Avg_rainfall) rows into the daily arrays; returns the rows touched."""
+        dates = pd.to_datetime(chunk['Date'], format='%Y-%m-%d')
+        districts = chunk['District'].astype('category')
+        # Each distinct spelling is resolved once; several spellings may share a key (Mysore, Mysuru)
+        category_keys = np.array([district_key(name) for name in districts.cat.categories], dtype=object)
+        keys = category_keys[districts.cat.codes.to_numpy()]
+        pairs = pd.MultiIndex.from_arrays([keys, dates.dt.year.astype(int)])
+        codes, uniques = pairs.factorize()
+        rows = self._row_indices(list(uniques))
+        self.daily[rows[codes], dates.dt.dayofyear.to_numpy() - 1] = chunk['Avg_rainfall'].to_numpy(dtype=np.float64)
+        for name in districts.cat.categories:
+            self._names.setdefault(district_key(name), canonical_district(name))
+        return set(rows.tolist())
+
+    def ingest(self, path, chunk_rows=CHUNK_ROWS):
+        """
+        Ingests one rainfall file (CSV or Parquet) unless a file with the same contents already was.
+        Returns the number of rows read.
+        """
+        sha256 = file_sha256(path)
+        if sha256 in self.ledger:
+            # Same contents under a new path or mtime: remember the stamp so the next check skips the hash
+            self.ledger[sha256].setdefault('stamps', {})[path] = _file_stamp(path)
+            _write_ledger(self.store_dir, self.ledger)
+            return 0
+        touched, total = set(), 0
+        for chunk in _iter_rainfall_chunks(path, chunk_rows):
+            touched |= self.add_chunk(chunk)
+            total += len(chunk)
+        self._update_aggregates(sorted(touched))
+        self.ledger[sha256] = {'path': path, 'rows': total, 'ingested_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+                               'stamps': {path: _file_stamp(path)}}
+        self._save(touched)
+        return total
+
+    def _update_aggregates(self, rows):
+        if not rows:
+            return
+        years = year_aggregates([self.keys[row] for row in rows], self.daily[rows])
+        years.insert(0, 'district', years.index.get_level_values('district_key').map(self._names))
+        if self.years is not None:
+            years = pd.concat([self.years.drop(years.index, errors='ignore'), years]).sort_index()
+        self.years = years
+
+        touched_districts = sorted({self.keys[row][0] for row in rows})
+        summary = district_summary(self.years.loc[touched_districts])
+        if self.districts is not None:
+            summary = pd.concat([self.districts.drop(summary.index, errors='ignore'), summary]).sort_index()
+        self.districts = summary
+
+    def _save(self, rows):
+        """Writes the daily shards of the years `rows` belong to, the aggregates and the ledger."""
+        os.makedirs(self.paths['daily'], exist_ok=True)
+        for year in sorted({self.keys[row][1] for row in rows}):
+            year_rows = [row for row, (_, row_year) in enumerate(self.keys) if row_year == year]
+
+            def write_shard(path):
+                with open(path, 'wb') as f:
+                    np.savez(f, district_keys=np.array([self.keys[row][0] for row in year_rows], dtype=str), daily=self.daily[year_rows])
+            _replace(_shard_path(self.store_dir, year), write_shard)
+        _replace(self.paths['years'], self.years.to_parquet)
+        _replace(self.paths['districts'], self.districts.to_parquet)
+        # Written last: a crash before this point only means the file is ingested again
+        _write_ledger(self.store_dir, self.ledger)
+
+
+def _iter_rainfall_chunks(path, chunk_rows):
+    columns = ['District', 'Date', 'Avg_rainfall']
+    if str(path).endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, usecols=lambda column: column.strip() in columns):
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def longest_dry_spell(daily):
+    """
+    Longest run of consecutive dry days in each row, between the row's first and last observed
+    day. A day without a record counts as dry, as it adds no rainfall to the totals either.
+    """
+    observed = ~np.isnan(daily)
+    day = np.arange(daily.shape[1])
+    first = np.where(observed.any(axis=1), observed.argmax(axis=1), daily.shape[1])
+    last = daily.shape[1] - 1 - observed[:, ::-1].argmax(axis=1)
+    in_range = (day >= first[:, np.newaxis]) & (day <= last[:, np.newaxis])
+    dry = in_range & ~(np.nan_to_num(daily) >= DRY_DAY_MM)
+    # Days since the last wet (or out-of-range) day, which is the running spell length on dry days
+    last_break = np.maximum.accumulate(np.where(dry, -1, day), axis=1)
+    spell = np.where(dry, day - last_break, 0)
+    return spell.max(axis=1)
+
+
+def year_aggregates(keys, daily):
+    """Annual, monthly and monsoon totals, observed days and longest dry spell of district-year rows."""
+    years = np.array([year for _, year in keys])
+    is_leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    filled = np.nan_to_num(daily)
+    monthly = np.empty((len(keys), 12))
+    for leap in (False, True):
+        rows = is_leap == leap
+        if rows.any():
+            monthly[rows] = np.add.reduceat(filled[rows], _MONTH_STARTS[leap], axis=1)
+    aggregates = pd.DataFrame(monthly, columns=MONTH_COLUMNS, index=pd.MultiIndex.from_tuples(keys, names=['district_key', 'year']))
+    aggregates.insert(0, 'annual_total_mm', monthly.sum(axis=1))
+    aggregates.insert(1, 'monsoon_total_mm', monthly[:, np.array(MONSOON_MONTHS) - 1].sum(axis=1))
+    aggregates.insert(2, 'observed_days', (~np.isnan(daily)).sum(axis=1))
+    aggregates.insert(3, 'longest_dry_spell_days', longest_dry_spell(daily))
+    return aggregates
+
+
+def district_summary(years):
+    """Per-district rainfall KPIs from the district-year aggregates."""
+    grouped = years.groupby(level='district_key')
+    annual = years['annual_total_mm']
+    # Mean absolute change between consecutive years on record, in percent
+    change = annual.groupby(level='district_key').pct_change().abs() * 100
+    summary = pd.DataFrame({
+        'district': grouped['district'].first(),
+        'annual_rainfall_mm': grouped['annual_total_mm'].mean(),
+        'rainfall_years': grouped.size(),
+        'monsoon_share': grouped['monsoon_total_mm'].sum() / grouped['annual_total_mm'].sum(),
+        'longest_dry_spell_days': grouped['longest_dry_spell_days'].max(),
+        'rainfall_yoy_variability_pct': change.groupby(level='district_key').mean(),
+    })
+    return summary.join(grouped[MONTH_COLUMNS].mean())
+
+
+def ingest_rainfall(paths, store_dir=STORE_DIR, chunk_rows=CHUNK_ROWS):
+    """Ingests every file in `paths` in order; returns {path: rows read} (0 for files already ingested)."""
+    ledger = _read_ledger(store_dir)
+    if all(_already_ingested(ledger, path) for path in paths):
+        # The common case on every page load: nothing new, so neither hash the files nor load the store
+        return {path: 0 for path in paths}
+    store = RainfallStore(store_dir)
+    return {path: store.ingest(path, chunk_rows) for path in paths}
+
+
+def load_rainfall_summary(store_dir=STORE_DIR):
+    """The per-district rainfall KPIs, indexed by district_key, or None for an empty store."""
+    path = _paths(store_dir)['districts']
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def rainfall_store_version(store_dir=STORE_DIR):
+    """Changes with every ingestion: the modification time of the ledger, or None for an empty store."""
+    path = _paths(store_dir)['ledger']
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ingests daily district rainfall files into the rainfall store.")
+    parser.add_argument('files', nargs='+', help="CSV or Parquet files with District, Date and Avg_rainfall columns.")
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    for path, rows in ingest_rainfall(args.files, args.store, args.chunk_rows).items():
+        print(f"{path}: {f'{rows} rows ingested' if rows else 'already ingested, skipped'}")
+    summary = load_rainfall_summary(args.store)
+    print(f"Store '{args.store}' covers {len(summary)} districts, {int(summary['rainfall_years'].sum())} district-years.")
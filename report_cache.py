@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# --- Report Cache ---
+# Finished LLM reports keyed by (KPI fingerprint, prompt template version, model, language).
+# The prompt for a district is fully determined by its KPIs and ratings, so an identical key
+# means an identical request; the stored report is replayed instead of generated again.
+# Entries are JSON files on disk that expire after a TTL, and the least recently used ones are
+# evicted once the cache holds more than `max_entries` reports or `max_disk_bytes` bytes.
+CACHE_DIR = 'cache/reports'
+TTL_SECONDS = 7 * 24 * 3600
+
+
+def kpi_fingerprint(district_en, kpis):
+    """Hash of a district's prompt inputs; `kpis` is any JSON-serializable dict of values and ratings."""
+    payload = json.dumps({'district': district_en, 'kpis': kpis}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def report_key(fingerprint, template_version, model_name, language):
+    return hashlib.sha256(f'{fingerprint}:{template_version}:{model_name}:{language}'.encode()).hexdigest()
+
+
+class ReportCache:
+    def __init__(self, directory=CACHE_DIR, ttl_seconds=TTL_SECONDS, max_entries=500, max_disk_bytes=32 * 1024 * 1024):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def _entries(self):
+        """(path, metadata) of every entry, read from the files themselves."""
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                path = os.path.join(self.directory, name)
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        yield path, json.load(f)
+                except (FileNotFoundError, ValueError):
+                    continue
+
+    def get(self, key):
+        """Returns the cached report text for `key`, or None on a miss or an expired entry."""
+        with self._lock:
+            path = self._path(key)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self.stats['misses'] += 1
+                return None
+            if time.time() - entry['created_at'] > self.ttl_seconds:
+                os.remove(path)
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            os.utime(path)  # eviction is least-recently-used by mtime
+            self.stats['hits'] += 1
+            return entry['text']
+
+    def put(self, key, text, **metadata):
+        """Stores a finished report; `metadata` (district, language, model, ...) is kept for invalidation."""
+        entry = {**metadata, 'created_at': time.time(), 'text': text}
+        with self._lock:
+            path = self._path(key)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes and count <= self.max_entries:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+            count -= 1
+            self.stats['evictions'] += 1
+
+    def invalidate(self, **match):
+        """
+        Removes every entry whose metadata matches all of `match`, e.g. invalidate(district='Mysuru')
+        or invalidate(language='kn'); with no arguments, removes everything. Returns the count removed.
+        """
+        removed = 0
+        with self._lock:
+            for path, entry in list(self._entries()):
+                if all(entry.get(field) == value for field, value in match.items()):
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def reports(self, **match):
+        """The unexpired entries (metadata, 'created_at' and 'text') whose metadata matches all of `match`."""
+        with self._lock:
+            entries = [entry for _, entry in self._entries()]
+        now = time.time()
+        return [entry for entry in entries
+                if now - entry['created_at'] <= self.ttl_seconds and all(entry.get(field) == value for field, value in match.items())]
+
+    def summary(self):
+        """Entry count, total bytes and the cached districts, for the admin panel."""
+        with self._lock:
+            entries = list(self._entries())
+        return {
+            'entries': len(entries),
+            'bytes': sum(os.path.getsize(path) for path, _ in entries),
+            'districts': sorted({entry.get('district') for _, entry in entries if entry.get('district')}),
+        }
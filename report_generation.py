@@ -0,0 +1,109 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from llm_metrics import LatencyRecorder
+from site_report import cache_metadata, request_cache_key
+from translation_memory import TranslationMemory
+
+# --- Report Generation ---
+# Streams one feasibility report from any LLM backend: cache hits are replayed, English reports
+# stream straight from the backend, and Kannada reports are translated in batches of paragraphs
+# while the English is still being generated. Backend calls and the report as a whole are timed
+# by a LatencyRecorder. Free of Streamlit, so the pages and benchmarks share it.
+
+
+def replay(report_text):
+    # Cached reports are yielded paragraph by paragraph, so stream_handler renders them unchanged
+    for paragraph in re.split(r'(?<=\n\n)', report_text):
+        yield paragraph
+
+
+def stream_translation(backend, english_chunks, translation_memory):
+    """
+    Translates a streaming English report into Kannada, pipelined: paragraphs are translated
+    while later ones are still being generated. One translation request is in flight at a time
+    and takes every paragraph completed since the previous one was sent, so the first paragraph
+    is not held back, later requests batch the unknown segments of several paragraphs, and a
+    cached English report is translated in one request. Translations are yielded in order.
+    """
+    waiting = []
+    buffer = ""
+    first = True
+
+    def joined(translations):
+        nonlocal first
+        text = ("" if first else "\n\n") + "\n\n".join(translation.strip() for translation in translations)
+        first = False
+        return text
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        in_flight = None
+        for chunk in english_chunks:
+            buffer += chunk
+            *paragraphs, buffer = buffer.split("\n\n")
+            waiting.extend(paragraph for paragraph in paragraphs if paragraph.strip())
+            if in_flight is not None and in_flight.done():
+                yield joined(in_flight.result())
+                in_flight = None
+            if in_flight is None and waiting:
+                in_flight = pool.submit(translation_memory.translate, backend, waiting)
+                waiting = []
+        if buffer.strip():
+            waiting.append(buffer)
+        if in_flight is not None:
+            yield joined(in_flight.result())
+        if waiting:
+            yield joined(translation_memory.translate(backend, waiting))
+
+
+def stream_report(request, language, backend, report_cache, recorder=None, translation_memory=None):
+    """
+    Yields the report for a site_report request in `language` ('en' or 'kn') and caches it.
+    Backend errors propagate to the caller; nothing is cached for a failed report.
+    """
+    recorder = recorder or LatencyRecorder(path=None)
+    translation_memory = translation_memory or TranslationMemory(path=None)
+    labels = {'district': request['district'], 'language': language}
+    cache_key = request_cache_key(request, language, backend.model_name)
+    cached_report = report_cache.get(cache_key)
+    if cached_report is not None:
+        yield from replay(cached_report)
+        return
+    english_key = request_cache_key(request, 'en', backend.model_name)
+    # A Kannada report only needs the translation when the English one is already cached
+    english_report = report_cache.get(english_key) if language == 'kn' else None
+
+    started = time.perf_counter()
+    first_chunk, english_seconds, report = None, 0.0, ""
+    english_parts = []
+
+    def english_chunks():
+        nonlocal english_seconds
+        generation = recorder.instrument(backend, 'generation', **labels)
+        for chunk in generation.stream(request['prompt']):
+            english_parts.append(chunk)
+            yield chunk
+        english_parts.append(request['verdict_chunk'])
+        english_seconds = time.perf_counter() - started
+        yield request['verdict_chunk']
+
+    if language == 'kn':
+        # The English report is never shown: its paragraphs go straight to translation
+        translation = recorder.instrument(backend, 'translation', **labels)
+        chunks = stream_translation(translation, [english_report] if english_report is not None else english_chunks(),
+                                    translation_memory)
+    else:
+        chunks = english_chunks()
+    for chunk in chunks:
+        first_chunk = first_chunk or time.perf_counter()
+        report += chunk
+        yield chunk
+
+    total = time.perf_counter() - started
+    recorder.record(model=backend.model_name, kind='report', ttft_seconds=round((first_chunk or time.perf_counter()) - started, 4),
+                    total_seconds=round(total, 4), translation_overhead_seconds=round(total - english_seconds, 4) if language == 'kn' else None,
+                    **labels)
+    if english_parts:
+        report_cache.put(english_key, "".join(english_parts), **cache_metadata(request, 'en', backend.model_name))
+    if language == 'kn':
+        report_cache.put(cache_key, report, **cache_metadata(request, 'kn', backend.model_name))
@@ -0,0 +1,215 @@
+import html
+import re
+import zipfile
+from report_generation import replay
+from translations import DISTRICT_MAP_EN_KN, LANG_STRINGS
+
+# --- HTML Reports ---
+# Renders the Markdown of LLM reports to HTML in one pass over the text. The renderer is fed
+# chunks as they stream in and returns the HTML of every line they complete, so a document is
+# produced while the report is still arriving. It handles paragraphs, headings (Markdown
+# headings and lines that are bold throughout, which is how the reports head their sections),
+# nested bullet and numbered lists (loose lists, with blank lines between items, stay one list),
+# and **bold** / *italic* emphasis within a line. As in CommonMark, a marker only opens when
+# followed by non-space and only closes after non-space, so "2 * 3" stays text, as do unmatched
+# markers. All reports share one stylesheet: standalone downloads inline it, bulk exports link
+# to a single report.css in the archive.
+REPORT_CSS = """@import url('https://fonts.googleapis.com/css2?family=Noto+Sans&family=Noto+Sans+Kannada&display=swap');
+body { font-family: 'Noto Sans', sans-serif; margin: 40px; line-height: 1.6; color: #333; background-color: #f9f9f9; }
+.kannada { font-family: 'Noto Sans Kannada', sans-serif; }
+.container { max-width: 800px; margin: auto; border: 1px solid #ddd; padding: 30px 50px; box-shadow: 0 0 15px rgba(0,0,0,0.05); background-color: #ffffff; border-radius: 8px; }
+h1, h2 { text-align: center; color: #0A192F; border-bottom: 2px solid #00A8E8; padding-bottom: 10px; }
+h2 { font-size: 1.2em; border-bottom: none; color: #555; margin-top: -15px; font-style: italic; }
+h3, h4, h5, h6 { color: #0A192F; margin-top: 25px; margin-bottom: 10px; }
+h3 { font-size: 1.2em; }
+ul, ol { padding-left: 1.5em; }
+"""
+STYLESHEET_NAME = 'report.css'
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*$')
+_BOLD_LINE = re.compile(r'^\*\*([^*]+)\*\*:?$')
+_LIST_ITEM = re.compile(r'^(\s*)([-*+]|\d+[.)])\s+(.*)$')
+_INLINE_TOKEN = re.compile(r'\*\*|\*|[^*]+')
+_INLINE_TAGS = {'**': 'strong', '*': 'em'}
+
+
+def render_inline(text):
+    """HTML of one line: escaped text with its matched ** and * pairs as <strong> and <em>."""
+    tokens = _INLINE_TOKEN.findall(text)
+    closing = {}
+    opened = []
+    for index, token in enumerate(tokens):
+        if token not in _INLINE_TAGS:
+            continue
+        # Flanking: an opener needs non-space after it, a closer non-space before it
+        can_open = index + 1 < len(tokens) and not tokens[index + 1][0].isspace()
+        can_close = index > 0 and not tokens[index - 1][-1].isspace()
+        # Close the latest open marker of the same kind; markers opened after it stay text
+        match = next((depth for depth in range(len(opened) - 1, -1, -1) if tokens[opened[depth]] == token), None) if can_close else None
+        if match is not None:
+            closing[opened[match]] = index
+            del opened[match:]
+        elif can_open:
+            opened.append(index)
+    closed = set(closing.values())
+    parts = []
+    for index, token in enumerate(tokens):
+        if index in closing:
+            parts.append(f'<{_INLINE_TAGS[token]}>')
+        elif index in closed:
+            parts.append(f'</{_INLINE_TAGS[token]}>')
+        else:
+            parts.append(html.escape(token, quote=False))
+    return ''.join(parts)
+
+
+class MarkdownRenderer:
+    """
+    Incremental Markdown-to-HTML renderer: feed() takes the next chunk of text and returns the
+    HTML of the lines it completed, close() returns the rest. Joined, the returned pieces are
+    the HTML of the whole text. Every character is processed once, whatever the chunking.
+    """
+
+    def __init__(self):
+        self._partial = []    # pieces of the line not yet ended by a newline
+        self._paragraph = False
+        self._lists = []      # [indent, tag] of the open lists, outermost first
+
+    def feed(self, chunk):
+        if '\n' not in chunk:
+            self._partial.append(chunk)
+            return ''
+        first, *lines, rest = chunk.split('\n')
+        self._partial.append(first)
+        lines.insert(0, ''.join(self._partial))
+        self._partial = [rest]
+        return ''.join(self._line(line) for line in lines)
+
+    def close(self):
+        last = ''.join(self._partial)
+        self._partial = []
+        return self._line(last) + self._close_blocks()
+
+    def _close_paragraph(self):
+        if not self._paragraph:
+            return ''
+        self._paragraph = False
+        return '</p>\n'
+
+    def _close_lists(self, indent=-1):
+        """Closes the open lists nested deeper than `indent` (by default all of them)."""
+        parts = []
+        while self._lists and self._lists[-1][0] > indent:
+            parts.append(f'</li></{self._lists.pop()[1]}>\n')
+        return ''.join(parts)
+
+    def _close_blocks(self):
+        return self._close_paragraph() + self._close_lists()
+
+    def _line(self, line):
+        line = line.rstrip()
+        if not line.strip():
+            # Lists stay open: they close at the next line that is not one of their items
+            return self._close_paragraph()
+        item = _LIST_ITEM.match(line)
+        if item:
+            return self._list_item(len(item.group(1).expandtabs(4)), item.group(2), item.group(3))
+        heading = _HEADING.match(line.strip())
+        if heading:
+            # Report headings sit below the document title (h1) and district (h2)
+            level = min(len(heading.group(1)) + 2, 6)
+            return self._close_blocks() + f'<h{level}>{render_inline(heading.group(2))}</h{level}>\n'
+        bold_line = _BOLD_LINE.match(line.strip())
+        if bold_line:
+            return self._close_blocks() + f'<h3>{render_inline(bold_line.group(1).strip())}</h3>\n'
+        if self._lists and line[0].isspace():
+            # An indented line continues the current list item
+            return f'<br>{render_inline(line.strip())}'
+        prefix = self._close_lists()
+        if self._paragraph:
+            return f'{prefix}<br>\n{render_inline(line.strip())}'
+        self._paragraph = True
+        return f'{prefix}<p>{render_inline(line.strip())}'
+
+    def _list_item(self, indent, marker, text):
+        tag = 'ol' if marker[0].isdigit() else 'ul'
+        parts = [self._close_paragraph(), self._close_lists(indent)]
+        if self._lists and self._lists[-1][0] == indent:
+            if self._lists[-1][1] == tag:
+                parts.append('</li>\n')
+            else:
+                parts.append(f'</li></{self._lists.pop()[1]}>\n')
+        if not self._lists or self._lists[-1][0] < indent:
+            start = int(marker[:-1]) if tag == 'ol' else 1
+            parts.append(f'<{tag} start="{start}">\n' if start != 1 else f'<{tag}>\n')
+            self._lists.append([indent, tag])
+        parts.append(f'<li>{render_inline(text)}')
+        return ''.join(parts)
+
+
+def render_markdown(text):
+    renderer = MarkdownRenderer()
+    return renderer.feed(text) + renderer.close()
+
+
+def report_html_chunks(report_chunks, language, district_en, stylesheet_href=None):
+    """
+    Yields the HTML document of a report as its Markdown chunks arrive. The stylesheet is
+    inlined unless `stylesheet_href` points to a shared copy of REPORT_CSS.
+    """
+    district_display = DISTRICT_MAP_EN_KN.get(district_en, district_en) if language == 'kn' else district_en
+    report_title = html.escape(LANG_STRINGS['pdf_report_title'][language])
+    district_display = html.escape(district_display)
+    if stylesheet_href:
+        style = f'<link rel="stylesheet" href="{html.escape(stylesheet_href)}">'
+    else:
+        style = f'<style>\n{REPORT_CSS}</style>'
+    yield (f'<!DOCTYPE html><html lang="{language}"><head><meta charset="UTF-8"><title>{report_title} - {district_display}</title>{style}</head>'
+           f'<body class="{"kannada" if language == "kn" else ""}"><div class="container"><h1>{report_title}</h1><h2>- {district_display} -</h2>\n')
+    renderer = MarkdownRenderer()
+    for chunk in report_chunks:
+        rendered = renderer.feed(chunk)
+        if rendered:
+            yield rendered
+    yield renderer.close()
+    yield '</div></body></html>\n'
+
+
+def report_html(report_text, language, district_en):
+    """A standalone HTML document of a report, with the stylesheet inlined."""
+    return ''.join(report_html_chunks([report_text], language, district_en))
+
+
+def export_reports_zip(report_cache, fileobj, language=None):
+    """
+    Writes the newest cached report of every district (in `language`, or in every language)
+    into a zip archive, as <language>/Feasibility_Report_<district>.html next to one shared
+    report.css. Each document is rendered straight into its archive entry. Returns the count.
+    """
+    newest = {}
+    for entry in report_cache.reports(**({'language': language} if language else {})):
+        report_id = (entry.get('district'), entry.get('language'))
+        if None not in report_id and (report_id not in newest or entry['created_at'] > newest[report_id]['created_at']):
+            newest[report_id] = entry
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(STYLESHEET_NAME, REPORT_CSS)
+        for (district_en, report_language), entry in sorted(newest.items()):
+            name = f"{report_language}/Feasibility_Report_{district_en.replace(' ', '_')}.html"
+            with archive.open(name, 'w') as f:
+                for piece in report_html_chunks(replay(entry['text']), report_language, district_en, f'../{STYLESHEET_NAME}'):
+                    f.write(piece.encode('utf-8'))
+    return len(newest)
+
+
+if __name__ == '__main__':
+    import argparse
+    from report_cache import ReportCache
+
+    parser = argparse.ArgumentParser(description="Exports the cached district reports as HTML documents in one zip archive.")
+    parser.add_argument('--output', default='feasibility_reports.zip')
+    parser.add_argument('--language', choices=['en', 'kn'], default=None, help="Only reports in this language (default: all).")
+    args = parser.parse_args()
+
+    with open(args.output, 'wb') as f:
+        count = export_reports_zip(ReportCache(), f, args.language)
+    print(f"Exported {count} report(s) to '{args.output}'")
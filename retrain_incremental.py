@@ -0,0 +1,80 @@
+import argparse
+import sys
+import time
+import numpy as np
+import tensorflow as tf
+from lstm_numpy import extract_keras_weights
+from model_bundle import load_bundle, save_bundle
+from training_data import DATA_PATH, scan_appended_rows, collect_windows, residual_std, build_lstm_model
+
+# Warm-starts the latest model bundle on the rows appended to the CSV since it was trained.
+# Each bundle records how many rows it has consumed ('training_rows') and their hash, so a
+# nightly run only fine-tunes on the windows that touch new rows, plus a random replay
+# sample of older windows so the model does not drift away from the long-run history.
+# The bundle's scaler is kept fixed: the forecasting page scales with the persisted one.
+parser = argparse.ArgumentParser(description="Fine-tune the latest model bundle on newly appended fab data.")
+parser.add_argument('--data', default=DATA_PATH, help="CSV with the full (appended) history.")
+parser.add_argument('--bundle', default=None, help="Bundle to start from (default: latest in model/bundles).")
+parser.add_argument('--replay-ratio', type=float, default=1.0, help="Replayed old windows per new window.")
+parser.add_argument('--epochs', type=int, default=2)
+parser.add_argument('--batch-size', type=int, default=32)
+parser.add_argument('--learning-rate', type=float, default=1e-4, help="Lower than the from-scratch rate, to fine-tune rather than retrain.")
+parser.add_argument('--seed', type=int, default=None)
+args = parser.parse_args()
+
+print("--- Incremental Training Started ---")
+start_time = time.perf_counter()
+
+try:
+    parent = load_bundle(args.bundle)
+    consumed_rows = parent.metadata['training_rows']
+    n_rows, prefix_sha256, data_sha256 = scan_appended_rows(args.data, parent.feature_columns, consumed_rows)
+except FileNotFoundError as e:
+    print(f"Error: {e}. Please run train_forecasting_model.py first.")
+    exit()
+
+print(f"Bundle v{parent.version} has consumed {consumed_rows} rows; the data now has {n_rows}.")
+if n_rows < consumed_rows or prefix_sha256 != parent.metadata['training_data_sha256']:
+    print("Error: the first rows no longer match the data this bundle was trained on. "
+          "History was rewritten rather than appended; run train_forecasting_model.py for a full retrain.")
+    sys.exit(1)
+if n_rows == consumed_rows:
+    print("No new rows since the last training run. Nothing to do.")
+    exit()
+
+# --- 1. Select Windows ---
+# Windows whose predicted rows all lie before the first new row were already trained on;
+# every other window contains or predicts a new row. Replay targets are drawn from the former.
+sequence_length = parent.sequence_length
+output_horizon = parent.metadata.get('output_horizon', 1)
+first_new_target = max(consumed_rows - output_horizon + 1, sequence_length)
+new_targets = np.arange(first_new_target, n_rows - output_horizon + 1)
+old_targets = np.arange(sequence_length, first_new_target)
+rng = np.random.default_rng(args.seed)
+n_replay = min(len(old_targets), int(round(args.replay_ratio * len(new_targets))))
+replay_targets = np.sort(rng.choice(old_targets, size=n_replay, replace=False))
+x, y = collect_windows(args.data, parent.feature_columns, parent.scaler(), sequence_length,
+                       np.concatenate([replay_targets, new_targets]), output_horizon=output_horizon)
+print(f"Fine-tuning on {len(new_targets)} new and {n_replay} replayed windows.")
+
+# --- 2. Fine-tune ---
+units = tuple(parent.metadata['lstm_units'])
+model = build_lstm_model(sequence_length, len(parent.feature_columns), units=units, output_horizon=output_horizon, weights=parent.weights)
+model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=args.learning_rate), loss='mean_squared_error')
+model.fit(x, y, batch_size=args.batch_size, epochs=args.epochs, shuffle=True, verbose=1)
+
+# --- 3. Save the Next Bundle Version ---
+# The residual spread is re-estimated on the fine-tuning windows only; a full pass would
+# cost as much as the full retrain this script avoids. Only the first predicted day counts.
+dataset = tf.data.Dataset.from_tensor_slices((x, y)).batch(1024)
+one_step_std = residual_std(model, dataset)[:len(parent.feature_columns)]
+bundle_path = save_bundle(extract_keras_weights(model), parent.scaler(), parent.feature_columns, sequence_length, n_rows, data_sha256,
+                          extra_metadata={
+                              'residual_std': one_step_std.tolist(),
+                              'parent_version': parent.version,
+                              'parent_sha256': parent.sha256,
+                              'fine_tuned_rows': [consumed_rows, n_rows],
+                              'replay_windows': n_replay,
+                          })
+print(f"Model bundle saved to '{bundle_path}' in {time.perf_counter() - start_time:.1f}s")
+print("--- Incremental Training Finished ---")
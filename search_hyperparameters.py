@@ -0,0 +1,208 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from forecasting import FEATURE_COLUMNS, DAYS_PER_YEAR, one_step_residual_std
+from lstm_numpy import NumpyLSTMForecaster
+from model_bundle import data_fingerprint, load_bundle, save_bundle
+from training_data import DATA_PATH, iter_feature_chunks
+
+# --- Hyperparameter Search ---
+# Trains one LSTM configuration per trial, each in its own process (TensorFlow state is not
+# shared or reused between trials) with a fixed thread budget, so trials run side by side
+# across the CPU cores. Every trial trains on the first part of the history and is scored by
+# rolling out the NumPy forecaster from origins in the held-out tail, so one-step and direct
+# multi-horizon models are compared on the same multi-day error. With --promote, the best
+# trial's bundle becomes the next version in model/bundles, but only if it beats the latest
+# bundle scored on the same held-out tail (trial bundles are fit on the training part only).
+SEARCH_DIR = 'model/search'
+VALIDATION_FRACTION = 0.2
+EVAL_HORIZON = 30  # days rolled out from each validation origin
+EVAL_STRIDE = 5
+
+
+def _limit_threads(threads):
+    """Pool initializer: must run before TensorFlow is imported in the worker."""
+    for variable in ('OMP_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS'):
+        os.environ[variable] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def validation_rmse(forecaster, scaled_data, sequence_length, first_origin, eval_horizon=EVAL_HORIZON, stride=EVAL_STRIDE):
+    """
+    RMSE (scaled units) of `eval_horizon`-day rollouts from every `stride`-th origin from
+    `first_origin` on; all origins are rolled out together as one batch.
+    """
+    origins = np.arange(first_origin, len(scaled_data) - eval_horizon + 1, stride)
+    seeds = sliding_window_view(scaled_data, sequence_length, axis=0).transpose(0, 2, 1)[origins - sequence_length]
+    actual = sliding_window_view(scaled_data, eval_horizon, axis=0).transpose(0, 2, 1)[origins]
+    predicted = forecaster.rollout(seeds, eval_horizon)
+    return float(np.sqrt(np.mean((predicted - actual) ** 2)))
+
+
+def bundle_validation_rmse(bundle, values, scaler, first_origin, eval_horizon=EVAL_HORIZON, stride=EVAL_STRIDE):
+    """
+    validation_rmse of an existing bundle, in the units of a trial's `scaler`: the bundle rolls
+    out in its own scaling and its forecasts are rescaled, so the figure compares with val_rmse.
+    """
+    sequence_length, n_features = bundle.sequence_length, values.shape[1]
+    origins = np.arange(first_origin, len(values) - eval_horizon + 1, stride)
+    seeds = sliding_window_view(bundle.scale(values).astype(np.float32), sequence_length, axis=0).transpose(0, 2, 1)[origins - sequence_length]
+    forecast = bundle.inverse_scale(bundle.forecaster.rollout(seeds, eval_horizon))
+    predicted = scaler.transform(forecast.reshape(-1, n_features)).reshape(forecast.shape)
+    actual = sliding_window_view(scaler.transform(values), eval_horizon, axis=0).transpose(0, 2, 1)[origins]
+    return float(np.sqrt(np.mean((predicted - actual) ** 2)))
+
+
+def run_trial(trial, config, data_path, run_dir, validation_fraction=VALIDATION_FRACTION, eval_horizon=EVAL_HORIZON, seed=0):
+    """Trains and scores one configuration; returns its row of the results table."""
+    import tensorflow as tf
+    from lstm_numpy import extract_keras_weights
+    from sklearn.preprocessing import MinMaxScaler
+    from training_data import build_lstm_model, make_windows
+
+    tf.keras.utils.set_random_seed(seed)
+    sequence_length, output_horizon = config['sequence_length'], config['output_horizon']
+    values = np.concatenate(list(iter_feature_chunks(data_path, FEATURE_COLUMNS)))
+    train_rows = int(len(values) * (1 - validation_fraction))
+    scaler = MinMaxScaler(feature_range=(0, 1)).fit(values[:train_rows])
+    scaled_data = scaler.transform(values).astype(np.float32)
+    x, y = make_windows(scaled_data[:train_rows], sequence_length, output_horizon)
+
+    model = build_lstm_model(sequence_length, len(FEATURE_COLUMNS), units=config['units'], output_horizon=output_horizon)
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    start = time.perf_counter()
+    model.fit(x, y, batch_size=config['batch_size'], epochs=config['epochs'], shuffle=True, verbose=0)
+    train_seconds = time.perf_counter() - start
+
+    weights = extract_keras_weights(model)
+    forecaster = NumpyLSTMForecaster(weights)
+    error = validation_rmse(forecaster, scaled_data, sequence_length, train_rows, eval_horizon)
+    latency = []
+    for _ in range(3):
+        start = time.perf_counter()
+        forecaster.rollout(scaled_data[train_rows - sequence_length:train_rows], DAYS_PER_YEAR)
+        latency.append(time.perf_counter() - start)
+
+    bundle_path = save_bundle(weights, scaler, FEATURE_COLUMNS, sequence_length, train_rows, data_fingerprint(values[:train_rows]),
+                              directory=os.path.join(run_dir, f'trial_{trial:03d}'),
+                              extra_metadata={
+                                  'residual_std': one_step_residual_std(forecaster, scaled_data[:train_rows], sequence_length).tolist(),
+                                  'search_config': {**config, 'units': list(config['units'])},
+                                  'validation_rmse': error,
+                              })
+    return {
+        'trial': trial,
+        'sequence_length': sequence_length,
+        'units': 'x'.join(str(units) for units in config['units']),
+        'epochs': config['epochs'],
+        'output': 'one-step' if output_horizon == 1 else f'direct-{output_horizon}',
+        'val_rmse': error,
+        'train_seconds': train_seconds,
+        'latency_ms_per_year': min(latency) * 1000,
+        'parameters': model.count_params(),
+        'bundle': bundle_path,
+    }
+
+
+def search_configs(window_lengths, units_options, epochs_options, output_horizons, batch_size=32):
+    return [
+        {'sequence_length': window, 'units': units, 'epochs': epochs, 'output_horizon': horizon, 'batch_size': batch_size}
+        for window, units, epochs, horizon in itertools.product(window_lengths, units_options, epochs_options, output_horizons)
+    ]
+
+
+def promote(row):
+    """Copies the trial's bundle into model/bundles as the next version."""
+    candidate = load_bundle(row['bundle'])
+    return save_bundle(candidate.weights, candidate.scaler(), candidate.feature_columns, candidate.sequence_length,
+                       candidate.metadata['training_rows'], candidate.metadata['training_data_sha256'],
+                       extra_metadata={
+                           'residual_std': candidate.metadata['residual_std'],
+                           'search_config': candidate.metadata['search_config'],
+                           'validation_rmse': candidate.metadata['validation_rmse'],
+                           'promoted_from': row['bundle'],
+                       })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter and architecture search for the LSTM forecaster.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--window-lengths', type=int, nargs='+', default=[30, 60, 90])
+    parser.add_argument('--units', nargs='+', default=['50,50', '32'], help="LSTM layer sizes per option, e.g. 50,50 for two layers.")
+    parser.add_argument('--epochs', type=int, nargs='+', default=[1, 3])
+    parser.add_argument('--output-horizons', type=int, nargs='+', default=[1, 7], help="1 = one-step; N > 1 = direct N-day output.")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads-per-trial', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None, help="Parallel trials (default: CPU cores / threads per trial).")
+    parser.add_argument('--eval-horizon', type=int, default=EVAL_HORIZON)
+    parser.add_argument('--promote', action=argparse.BooleanOptionalAction, default=False,
+                        help="Promote the best trial to model/bundles if it beats the latest bundle on the validation tail.")
+    args = parser.parse_args()
+
+    configs = search_configs(args.window_lengths, [tuple(int(u) for u in option.split(',')) for option in args.units],
+                             args.epochs, args.output_horizons, args.batch_size)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads_per_trial)
+    run_dir = os.path.join(SEARCH_DIR, datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(run_dir, exist_ok=True)
+    print(f"Running {len(configs)} trials on {workers} worker(s) with {args.threads_per_trial} thread(s) each.")
+
+    # 'spawn' gives every trial a fresh interpreter (TensorFlow does not survive fork), and
+    # max_tasks_per_child=1 retires each process after its trial.
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_limit_threads, initargs=(args.threads_per_trial,), max_tasks_per_child=1) as pool:
+        futures = {pool.submit(run_trial, trial, config, args.data, run_dir, eval_horizon=args.eval_horizon): (trial, config)
+                   for trial, config in enumerate(configs)}
+        for future in as_completed(futures):
+            trial, config = futures[future]
+            try:
+                rows.append(future.result())
+                print(f"Trial {trial}: val RMSE {rows[-1]['val_rmse']:.4f} ({len(rows)}/{len(configs)} done)")
+            except Exception as e:
+                print(f"Trial {trial} ({config}) failed: {e}")
+
+    if not rows:
+        print("Error: every trial failed.")
+        exit(1)
+    results = pd.DataFrame(rows).sort_values('val_rmse').reset_index(drop=True)
+    results.to_csv(os.path.join(run_dir, 'results.csv'), index=False)
+    print(results.drop(columns='bundle').to_string(index=False))
+    print(f"Results written to '{os.path.join(run_dir, 'results.csv')}'")
+
+    best = results.loc[0]
+    if not args.promote:
+        print(f"Best trial {best['trial']} was not promoted (pass --promote to promote it if it beats the latest bundle).")
+        exit(0)
+    try:
+        production = load_bundle()
+    except FileNotFoundError:
+        production = None
+    if production is not None and production.feature_columns == FEATURE_COLUMNS:
+        # The latest bundle is scored on the trials' validation tail, in the trials' scaled units
+        from sklearn.preprocessing import MinMaxScaler
+
+        values = np.concatenate(list(iter_feature_chunks(args.data, FEATURE_COLUMNS)))
+        train_rows = int(len(values) * (1 - VALIDATION_FRACTION))
+        scaler = MinMaxScaler(feature_range=(0, 1)).fit(values[:train_rows])
+        baseline = bundle_validation_rmse(production, values, scaler, train_rows, args.eval_horizon)
+        print(f"Latest bundle v{production.version}: val RMSE {baseline:.4f} on the same validation tail "
+              f"(it may have been trained on those days, which only favours it).")
+        if best['val_rmse'] >= baseline:
+            print(f"Best trial {best['trial']} (val RMSE {best['val_rmse']:.4f}) does not beat it; nothing was promoted.")
+            exit(0)
+    elif production is not None:
+        print(f"Latest bundle v{production.version} uses other feature columns; it is not compared.")
+    print(f"Promoted trial {best['trial']} (val RMSE {best['val_rmse']:.4f}, fit on the first {1 - VALIDATION_FRACTION:.0%} "
+          f"of the history) to '{promote(best)}'")
@@ -0,0 +1,96 @@
+import json
+import os
+import re
+import pandas as pd
+from file_hashing import file_sha256
+
+# --- Site Data Cache ---
+# The boiler and road CSVs are parsed once into typed Parquet files: numeric columns and
+# categorical district names (with Mysore standardized to Mysuru); the daily rainfall goes to
+# the rainfall store instead (rainfall_store.py). Each cache file has a sidecar recording the
+# source's mtime, size and SHA-256. A source whose mtime and size are unchanged is trusted
+# without reading it; otherwise it is re-hashed, and only a changed hash (or parser) rebuilds
+# the cache.
+CACHE_DIR = 'cache/site_data'
+SCHEMA_VERSION = 1
+RAINFALL_SOURCE = 'data/karnataka_avg_rain_2023.csv'  # ingested by the rainfall store
+SOURCES = {
+    'boilers': 'data/District_wise_Registered_Boilers.csv',
+    'roads': 'data/Summary_of_length_of_roads.csv',
+}
+
+
+def _standardize_districts(series):
+    """Categorical district names; the Mysuru rename touches each distinct name once, not every row."""
+    districts = series.astype('category')
+    renamed = {name: re.sub('mysore', 'Mysuru', name, flags=re.IGNORECASE) for name in districts.cat.categories}
+    return districts.map(renamed).astype('category')
+
+
+def _parse_boilers(path):
+    data = pd.read_csv(path, thousands=',')
+    data.columns = data.columns.str.strip()
+    data['DISTRICT'] = _standardize_districts(data['DISTRICT'])
+    return data
+
+
+def _parse_roads(path):
+    # Road lengths are written like "3,034.41"
+    data = pd.read_csv(path, thousands=',')
+    data.columns = data.columns.str.strip()
+    data['District'] = _standardize_districts(data['District'])
+    return data
+
+
+_PARSERS = {'boilers': _parse_boilers, 'roads': _parse_roads}
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def source_stamps():
+    """(name, mtime_ns, size) of every source; changes whenever one of the CSVs is edited."""
+    return tuple((name, *_source_stamp(path).values()) for name, path in SOURCES.items())
+
+
+def load_table(name, source_path=None, cache_dir=CACHE_DIR):
+    """
+    Returns the typed DataFrame for one of SOURCES, from the cache when it is still valid.
+    Raises FileNotFoundError if the source CSV is missing.
+    """
+    source_path = source_path or SOURCES[name]
+    stamp = _source_stamp(source_path)
+    cache_path = os.path.join(cache_dir, f'{name}.parquet')
+    meta_path = os.path.join(cache_dir, f'{name}.json')
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        meta = {}
+
+    valid = meta.get('schema_version') == SCHEMA_VERSION and meta.get('source') == source_path and os.path.exists(cache_path)
+    if valid and (meta.get('mtime_ns'), meta.get('size')) != (stamp['mtime_ns'], stamp['size']):
+        # Touched or copied, but possibly identical: only the content hash decides
+        sha256 = file_sha256(source_path)
+        valid = sha256 == meta.get('sha256')
+        if valid:
+            _write_meta(meta_path, {**meta, **stamp})
+    if valid:
+        return pd.read_parquet(cache_path)
+
+    data = _PARSERS[name](source_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    data.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+    _write_meta(meta_path, {'schema_version': SCHEMA_VERSION, 'source': source_path, 'sha256': file_sha256(source_path), **stamp})
+    return data
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = f'{meta_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
@@ -0,0 +1,90 @@
+from district_features import build_district_features, district_key, lookup_district, kpi_value
+from rainfall_store import ingest_rainfall, load_rainfall_summary
+from report_cache import kpi_fingerprint, report_key
+from site_data import RAINFALL_SOURCE, load_table
+from site_scoring import BENCHMARKS, DEFAULT_WEIGHTS, NOT_AVAILABLE, benchmark_text, score_districts
+
+# --- Site Report Requests ---
+# Everything a feasibility report depends on, without Streamlit or an LLM client: the district
+# features, the prompt built from a district's KPIs and ratings, the verdict, and the report
+# cache key. The Streamlit pages and the offline pre-generation job build identical requests,
+# so a report generated by one is served by the other.
+MODEL_NAME = 'gemini-1.5-flash-latest'
+# Part of every report cache key: bump it whenever the prompt or the verdict logic changes
+PROMPT_TEMPLATE_VERSION = 3
+TRANSLATION_SEPARATOR = '\n---\n\n'  # the source text of a translation prompt follows it
+
+
+def build_site_features():
+    """The district feature store from the rainfall store and the cached boiler and road tables."""
+    return build_district_features(load_rainfall_summary(), load_table('boilers'), load_table('roads'))
+
+
+def load_site_features():
+    """build_site_features() after ingesting the bundled rainfall CSV (a no-op once ingested)."""
+    ingest_rainfall([RAINFALL_SOURCE])
+    return build_site_features()
+
+
+def report_request(district_en, district_features, weights=None, district_scores=None):
+    """
+    Returns {'district', 'prompt', 'verdict_chunk', 'fingerprint'} for a district's report.
+    Pass `district_scores` (score_districts of the same features and weights) when building
+    requests for many districts, so the ranking is computed once. The weights shape the
+    district's score and rank, which the prompt and the cache fingerprint include.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    district_row = lookup_district(district_features, district_en)
+    if district_scores is None:
+        district_scores = score_districts(district_features, weights)
+    district_score = district_scores.loc[district_key(district_en)] if district_row is not None else None
+    kpi_lines, kpis = [], {}
+    for name, benchmark in BENCHMARKS.items():
+        unit = f" {benchmark['unit']}" if benchmark['unit'] else ''
+        value = kpi_value(district_row, benchmark['column'])
+        rating = district_score[f'{name}_rating'] if district_score is not None else NOT_AVAILABLE
+        kpis[name] = {'value': value, 'rating': rating, 'benchmark': benchmark_text(benchmark)}
+        kpi_lines.append(f"""    - **{benchmark['label']}:** {value}{unit} (rated: {rating})
+        - *Benchmark:* {benchmark_text(benchmark)}""")
+    kpi_text = "\n".join(kpi_lines)
+    weight_text = ", ".join(f"{name} {weight:g}" for name, weight in weights.items())
+    if district_score is not None:
+        score, rank = round(float(district_score['score']), 2), int(district_score['rank'])
+        score_text = f"{score:+.2f} on a scale of -1 to +1, rank {rank} of {len(district_scores)} districts (weights: {weight_text})"
+    else:
+        score, rank, score_text = None, None, NOT_AVAILABLE
+    # The verdict comes from the scoring engine, not from the wording of the narrative
+    verdict_text = district_score['verdict'] if district_score is not None else "Not Suitable"
+
+    analysis_prompt = f"""
+    **Role:** You are a senior semiconductor industry consultant.
+    **Analysis Location:** {district_en}, Karnataka, India
+    **Key Performance Indicators (KPIs) and Clear Benchmarks:**
+{kpi_text}
+    **Weighted Site Score:** {score_text}
+    **Task (Strict Instructions):**
+    1.  **Parameter Significance:** Briefly explain the importance of Water, Industrial Ecosystem, and Logistics.
+    2.  **Data-Driven Analysis:** Analyze each KPI, stating its value and the rating given above.
+    3.  **Synthesis & Conclusion:** Summarize the findings in light of the weighted site score and rank. **Do not write a final verdict yourself.**
+    Structure your response with clear, bold headings.
+    """
+    return {
+        'district': district_en,
+        'prompt': analysis_prompt,
+        'verdict_chunk': f"\n\n**Final Verdict**\n{verdict_text}",
+        'fingerprint': kpi_fingerprint(district_en, {**kpis, 'verdict': verdict_text, 'weights': weights, 'score': score, 'rank': rank}),
+    }
+
+
+def request_cache_key(request, language, model_name=MODEL_NAME):
+    return report_key(request['fingerprint'], PROMPT_TEMPLATE_VERSION, model_name, language)
+
+
+def cache_metadata(request, language, model_name=MODEL_NAME):
+    """Metadata stored with a cached report, used by ReportCache.invalidate."""
+    return {'district': request['district'], 'language': language, 'model': model_name, 'template_version': PROMPT_TEMPLATE_VERSION}
+
+
+def translation_prompt(paragraph):
+    return ("Translate the following part of a professional report accurately into formal Kannada. "
+            f"Retain all original Markdown formatting and reply with the translation only:\n{TRANSLATION_SEPARATOR}{paragraph}")
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# --- Site Scoring Engine ---
+# The feasibility verdict is rule-based: every KPI of the district feature store is rated
+# against the report's benchmarks, and the ratings are combined with configurable weights.
+# All districts are scored in one vectorized pass, so ranking the state needs no LLM call;
+# the LLM only writes the narrative around the ratings of the district a user picks.
+STRENGTH, NEUTRAL, WEAKNESS, NOT_AVAILABLE = 'Strength', 'Neutral', 'Weakness', 'Not Available'
+
+# A KPI above `strength_above` is a Strength, below `weakness_below` a Weakness, else Neutral
+BENCHMARKS = {
+    'water': {'label': 'Water Security (Total Annual Rainfall)', 'column': 'annual_rainfall_mm', 'unit': 'mm',
+              'strength_above': 700, 'weakness_below': 700},
+    'industry': {'label': 'Industrial Ecosystem (Working Boilers)', 'column': 'working_boilers', 'unit': '',
+                 'strength_above': 40, 'weakness_below': 20},
+    'logistics': {'label': 'Logistics Infrastructure (Total Road Length)', 'column': 'total_road_km', 'unit': 'Kms',
+                  'strength_above': 2000, 'weakness_below': 2000},
+}
+DEFAULT_WEIGHTS = {'water': 1.0, 'industry': 1.0, 'logistics': 1.0}
+MIN_STRENGTHS = 2  # a district with at least this many Strengths is Suitable
+
+
+def benchmark_text(benchmark):
+    """The benchmark as the report prompt states it, e.g. "> 40 is a **Strength**. < 20 is a **Weakness**."."""
+    unit = f" {benchmark['unit']}" if benchmark['unit'] else ''
+    text = f"> {benchmark['strength_above']}{unit} is a **Strength**."
+    if benchmark['weakness_below'] != benchmark['strength_above']:
+        text += f" < {benchmark['weakness_below']}{unit} is a **Weakness**."
+    return text
+
+
+def score_districts(features, weights=None, benchmarks=BENCHMARKS, min_strengths=MIN_STRENGTHS):
+    """
+    Rates and ranks every district of the feature store. Returns a DataFrame indexed like
+    `features`, sorted best first, with one rating column per benchmark, the strength count,
+    the weighted score in [-1, 1] (a missing KPI scores like a Neutral one), the verdict and the rank.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    names = list(benchmarks)
+    values = features[[benchmarks[name]['column'] for name in names]].to_numpy(dtype=np.float64)
+    strength_above = np.array([benchmarks[name]['strength_above'] for name in names], dtype=np.float64)
+    weakness_below = np.array([benchmarks[name]['weakness_below'] for name in names], dtype=np.float64)
+    weight = np.array([weights[name] for name in names], dtype=np.float64)
+
+    available = ~np.isnan(values)
+    points = np.select([values > strength_above, values < weakness_below], [1.0, -1.0], 0.0)
+    points[~available] = 0.0
+    score = (points @ weight) / (weight.sum() or 1.0)  # all weights at zero rank by strengths alone
+    strengths = (points > 0).sum(axis=1)
+
+    ratings = np.select([~available, points > 0, points < 0], [NOT_AVAILABLE, STRENGTH, WEAKNESS], NEUTRAL)
+    scores = pd.DataFrame(ratings, index=features.index, columns=[f'{name}_rating' for name in names])
+    scores.insert(0, 'district', features['district'])
+    scores['strengths'] = strengths
+    scores['score'] = score
+    scores['verdict'] = np.where(strengths >= min_strengths, 'Suitable', 'Not Suitable')
+    scores = scores.sort_values(['score', 'strengths', 'district'], ascending=[False, False, True])
+    scores['rank'] = np.arange(1, len(scores) + 1)
+    return scores
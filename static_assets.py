@@ -0,0 +1,55 @@
+import base64
+import mimetypes
+import os
+import re
+import shutil
+import streamlit as st
+
+# --- Static Assets ---
+# The portal's background image and 3D chip models are several MB each. With static file
+# serving enabled ([server] enableStaticServing in .streamlit/config.toml), each file is
+# published once per process and version into static/ and the pages reference it by URL, so a
+# rerun sends a few hundred bytes and browsers fetch (and cache) the file itself only once.
+# Published names carry the file's mtime, so an edited asset gets a new URL. When static
+# serving is off, the file is base64-encoded into a data URI once per path and mtime and the
+# encoded string is reused on every rerun.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+STATIC_URL = 'app/static'  # relative, so it also works under server.baseUrlPath
+MIME_TYPES = {'.glb': 'model/gltf-binary'}
+
+
+def asset_url(path, mime_type=None):
+    """Browser URL of a local asset file; raises FileNotFoundError if the file is missing."""
+    mtime_ns = os.stat(path).st_mtime_ns
+    if st.get_option('server.enableStaticServing'):
+        return _published_url(os.path.abspath(path), mtime_ns)
+    extension = os.path.splitext(path)[1].lower()
+    mime_type = mime_type or MIME_TYPES.get(extension) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    return _data_uri(os.path.abspath(path), mtime_ns, mime_type)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _published_url(path, mtime_ns):
+    # path and mtime_ns key the cache: the file is published again once it changes
+    stem, extension = os.path.splitext(os.path.basename(path))
+    name = f'{stem}-{mtime_ns:x}{extension}'
+    target = os.path.join(STATIC_DIR, name)
+    if not os.path.exists(target):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp_path = f'{target}.{os.getpid()}.tmp'
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+        # Older versions of the same asset are no longer referenced; the pattern matches only
+        # <stem>-<mtime hex><ext>, not other assets such as background-dark-<hex>.png for background.png
+        published = re.compile(rf'{re.escape(stem)}-[0-9a-f]+{re.escape(extension)}')
+        for stale in os.listdir(STATIC_DIR):
+            if published.fullmatch(stale) and stale != name:
+                os.remove(os.path.join(STATIC_DIR, stale))
+    return f'{STATIC_URL}/{name}'
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _data_uri(path, mtime_ns, mime_type):
+    # Cached as a resource, so the multi-MB string is neither copied nor re-encoded per rerun
+    with open(path, 'rb') as f:
+        return f'data:{mime_type};base64,{base64.b64encode(f.read()).decode()}'
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from lstm_numpy import NumpyLSTMForecaster, extract_keras_weights
+
+tf = pytest.importorskip('tensorflow')
+
+SEQUENCE_LENGTH = 12
+N_FEATURES = 4
+
+
+@pytest.fixture(scope='module')
+def keras_model():
+    from training_data import build_lstm_model
+
+    tf.keras.utils.set_random_seed(0)
+    return build_lstm_model(SEQUENCE_LENGTH, N_FEATURES, units=(8, 6))
+
+
+def test_predict_matches_keras(keras_model):
+    windows = np.random.default_rng(0).random((16, SEQUENCE_LENGTH, N_FEATURES), dtype=np.float32)
+    forecaster = NumpyLSTMForecaster(extract_keras_weights(keras_model))
+    np.testing.assert_allclose(forecaster.predict(windows), keras_model.predict(windows, verbose=0), atol=1e-5)
+
+
+def test_rollout_matches_keras(keras_model):
+    from keras_rollout import KerasRolloutEngine
+
+    last_sequence = np.random.default_rng(1).random((SEQUENCE_LENGTH, N_FEATURES), dtype=np.float32)
+    forecaster = NumpyLSTMForecaster(extract_keras_weights(keras_model))
+    expected = KerasRolloutEngine(keras_model, sequence_length=SEQUENCE_LENGTH).rollout(last_sequence, 30)
+    np.testing.assert_allclose(forecaster.rollout(last_sequence, 30), expected, atol=1e-5)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from rainfall_store import RainfallStore, ingest_rainfall, load_rainfall_summary
+
+
+def _chunk(rows):
+    return pd.DataFrame(rows, columns=['District', 'Date', 'Avg_rainfall'])
+
+
+def test_add_chunk_merges_spellings_of_one_district(tmp_path):
+    store = RainfallStore(str(tmp_path))
+    rows = store.add_chunk(_chunk([
+        ('Mysore', '2023-06-01', 10.0),
+        ('Mysuru', '2023-06-02', 20.0),
+        ('Bidar', '2023-06-01', 5.0),
+    ]))
+    assert len(rows) == 2
+    mysuru = store.daily[store.rows[('mysuru', 2023)]]
+    assert mysuru[151] == 10.0 and mysuru[152] == 20.0
+
+
+def test_incremental_ingestion_matches_batch(tmp_path):
+    first = _chunk([('Mysore', f'2022-07-{day:02d}', float(day)) for day in range(1, 29)])
+    second = _chunk([('Mysuru', f'2023-07-{day:02d}', float(day)) for day in range(1, 29)])
+    first.to_csv(tmp_path / 'first.csv', index=False)
+    second.to_csv(tmp_path / 'second.csv', index=False)
+    pd.concat([first, second]).to_csv(tmp_path / 'both.csv', index=False)
+
+    ingest_rainfall([str(tmp_path / 'first.csv')], str(tmp_path / 'incremental'))
+    assert ingest_rainfall([str(tmp_path / 'first.csv'), str(tmp_path / 'second.csv')], str(tmp_path / 'incremental')) == {
+        str(tmp_path / 'first.csv'): 0, str(tmp_path / 'second.csv'): 28}
+    ingest_rainfall([str(tmp_path / 'both.csv')], str(tmp_path / 'batch'))
+
+    incremental = load_rainfall_summary(str(tmp_path / 'incremental'))
+    pd.testing.assert_frame_equal(incremental, load_rainfall_summary(str(tmp_path / 'batch')))
+    assert list(incremental.index) == ['mysuru'] and incremental.loc['mysuru', 'rainfall_years'] == 2
+    assert np.isclose(incremental.loc['mysuru', 'annual_rainfall_mm'], sum(range(1, 29)))
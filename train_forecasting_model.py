@@ -1,50 +1,40 @@
-import pandas as pd
-import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
+import argparse
+from forecasting import FEATURE_COLUMNS
+from lstm_numpy import extract_keras_weights
+from model_bundle import save_bundle
+from training_data import DATA_PATH, scan_training_data, make_dataset, residual_std, build_lstm_model
 import os
 
+parser = argparse.ArgumentParser(description="Trains the LSTM forecaster and saves a model bundle.")
+parser.add_argument('--data', default=DATA_PATH, help="Fab history: CSV, Parquet partitions, or a multi-fab panel (generate_fab_panel.py).")
+args = parser.parse_args()
+
 print("--- AI Model Training Script Started ---")
 
-# --- 1. Load and Preprocess the Data ---
+# --- 1. Scan and Normalize the Data ---
+# The data is streamed in chunks: one pass fits the scaler (LSTMs work best with values
+# between 0 and 1), counts the rows and hashes the data, without loading it all at once.
+# A multi-fab panel trains one pooled model, with windows taken within each fab.
 try:
-    df = pd.read_csv("data/synthetic_fab_data.csv")
-    print(f"Loaded dataset with {len(df)} rows.")
+    scaler, n_rows, data_sha256 = scan_training_data(args.data, FEATURE_COLUMNS)
+    print(f"Scanned dataset with {n_rows} rows.")
 except FileNotFoundError:
-    print("Error: synthetic_fab_data.csv not found. Please run generate_synthetic_data.py first.")
+    print(f"Error: {args.data} not found. Please run generate_synthetic_data.py first.")
     exit()
 
-# We will forecast all four key metrics
-data = df[['average_selling_price_usd', 'silicon_wafer_cost_usd', 'energy_cost_per_kwh_usd', 'total_daily_labor_cost_usd']].values
-
-# Normalize the data: LSTMs work best with values between 0 and 1
-scaler = MinMaxScaler(feature_range=(0, 1))
-scaled_data = scaler.fit_transform(data)
-
-# --- 2. Create Training Sequences ---
-# We will use the last 60 days of data to predict the next day
+# --- 2. Create the Training Input Pipeline ---
+# We will use the last 60 days of data to predict the next day. Windows are strided views
+# over each scaled chunk and are only copied one batch at a time, with prefetching so
+# reading the next chunk overlaps with training.
 sequence_length = 60
-X_train, y_train = [], []
-
-for i in range(sequence_length, len(scaled_data)):
-    X_train.append(scaled_data[i-sequence_length:i, :])
-    y_train.append(scaled_data[i, :])
-
-X_train, y_train = np.array(X_train), np.array(y_train)
-
-# Reshape the data for the LSTM model [samples, timesteps, features]
-X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], X_train.shape[2]))
-print(f"Created training data with shape: {X_train.shape}")
+batch_size = 32
+train_dataset = make_dataset(args.data, FEATURE_COLUMNS, scaler, sequence_length, batch_size, n_rows=n_rows)
+print(f"Streaming {int(train_dataset.cardinality())} batches of training windows of shape ({sequence_length}, {len(FEATURE_COLUMNS)}).")
 
 # --- 3. Build the LSTM Model ---
-model = Sequential()
-# Input layer
-model.add(LSTM(units=50, return_sequences=True, input_shape=(X_train.shape[1], X_train.shape[2])))
-# Hidden layer
-model.add(LSTM(units=50, return_sequences=False))
-# Output layer (predicting 4 features)
-model.add(Dense(units=4))
+# Two stacked LSTM layers of 50 units and a Dense output layer (predicting 4 features);
+# retrain_incremental.py rebuilds the same architecture from a bundle.
+model = build_lstm_model(sequence_length, len(FEATURE_COLUMNS), units=(50, 50))
 
 # Compile the model
 model.compile(optimizer='adam', loss='mean_squared_error')
@@ -54,7 +44,7 @@ model.summary()
 # --- 4. Train the Model ---
 print("\nStarting model training... (This may take a few minutes)")
 # epochs=1 is fast for a demonstration. For higher accuracy, you could increase this to 5 or 10.
-history = model.fit(X_train, y_train, epochs=1, batch_size=32, verbose=1)
+history = model.fit(train_dataset, epochs=1, verbose=1)
 print("Model training complete.")
 
 # --- 5. Save the Trained Model ---
@@ -64,4 +54,12 @@ if not os.path.exists('model'):
 
 model.save('model/fab_lstm_forecaster.h5')
 print("Trained model saved successfully to 'model/fab_lstm_forecaster.h5'")
-print("--- AI Model Training Script Finished ---")
\ No newline at end of file
+
+# The forecasting page loads this bundle: NumPy weights plus the fitted scaler and metadata,
+# so it neither imports TensorFlow nor refits the scaler on every forecast.
+# The one-step residual spread sets the noise of the Monte Carlo uncertainty bands.
+eval_dataset = make_dataset(args.data, FEATURE_COLUMNS, scaler, sequence_length, batch_size=1024, shuffle=False, n_rows=n_rows)
+bundle_path = save_bundle(extract_keras_weights(model), scaler, FEATURE_COLUMNS, sequence_length, n_rows, data_sha256,
+                          extra_metadata={'residual_std': residual_std(model, eval_dataset).tolist()})
+print(f"Model bundle saved to '{bundle_path}'")
+print("--- AI Model Training Script Finished ---")
@@ -0,0 +1,276 @@
+import glob
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import MinMaxScaler
+from fab_panel import is_panel, iter_panel_fabs, panel_fab_rows
+
+# --- Streaming Training Input ---
+# Training data is read in fixed-size CSV chunks and windowed with strided views, so memory
+# stays bounded by one chunk (plus the sequence overlap) however long the history grows.
+DATA_PATH = 'data/synthetic_fab_data.csv'
+CHUNK_ROWS = 100_000
+PANEL_SHUFFLE_FABS = 16  # fabs of a panel whose windows are shuffled together
+
+
+def iter_feature_chunks(path, feature_columns, chunk_rows=CHUNK_ROWS):
+    """
+    Yields the feature columns of `path` as float64 arrays of `chunk_rows` rows (the last one
+    may be shorter). `path` is a CSV file, a directory of part-NNNNN.parquet partitions as
+    written by generate_synthetic_data.py --format parquet, or a Parquet file such as a fab
+    panel (whose fabs then follow each other in the chunks).
+    """
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, 'part-*.parquet')))
+    elif path.endswith('.parquet'):
+        parts = [path]
+    else:
+        for chunk in pd.read_csv(path, usecols=feature_columns, chunksize=chunk_rows):
+            yield chunk[feature_columns].to_numpy(dtype=np.float64)
+        return
+
+    import pyarrow.parquet as pq
+
+    # Partition row groups rarely line up with chunk_rows, so batches are re-chunked
+    pending = np.empty((0, len(feature_columns)))
+    for part in parts:
+        for batch in pq.ParquetFile(part).iter_batches(batch_size=chunk_rows, columns=feature_columns):
+            values = np.column_stack([batch.column(col).to_numpy() for col in feature_columns]).astype(np.float64)
+            pending = np.concatenate([pending, values])
+            while len(pending) >= chunk_rows:
+                yield pending[:chunk_rows]
+                pending = pending[chunk_rows:]
+    if len(pending):
+        yield pending
+
+
+def scan_training_data(path, feature_columns, chunk_rows=CHUNK_ROWS):
+    """
+    One streaming pass over the data: fits the MinMaxScaler with partial_fit and computes the
+    row count and the same SHA-256 that model_bundle.data_fingerprint gives for the full array.
+    """
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    sha = hashlib.sha256()
+    rows = 0
+    for values in iter_feature_chunks(path, feature_columns, chunk_rows):
+        scaler.partial_fit(values)
+        sha.update(np.ascontiguousarray(values).tobytes())
+        rows += len(values)
+    return scaler, rows, sha.hexdigest()
+
+
+def iter_scaled_windows(path, feature_columns, scaler, sequence_length, chunk_rows=CHUNK_ROWS):
+    """
+    Yields (windows, targets) per chunk: windows is a [n, sequence_length, features] strided view
+    over the scaled rows (no copies), targets the row following each window. The last
+    `sequence_length` rows of every chunk are carried over so windows span chunk boundaries.
+    For a fab panel every fab is one chunk and nothing is carried, so no window mixes two fabs.
+    """
+    if is_panel(path):
+        for _, _, values in iter_panel_fabs(path, feature_columns):
+            if len(values) > sequence_length:
+                scaled = scaler.transform(values).astype(np.float32)
+                yield sliding_window_view(scaled[:-1], sequence_length, axis=0).transpose(0, 2, 1), scaled[sequence_length:]
+        return
+    carry = None
+    for values in iter_feature_chunks(path, feature_columns, chunk_rows):
+        scaled = scaler.transform(values).astype(np.float32)
+        rows = scaled if carry is None else np.concatenate([carry, scaled])
+        if len(rows) > sequence_length:
+            windows = sliding_window_view(rows[:-1], sequence_length, axis=0).transpose(0, 2, 1)
+            yield windows, rows[sequence_length:]
+        carry = rows[-sequence_length:]
+
+
+def iter_window_batches(path, feature_columns, scaler, sequence_length, batch_size, chunk_rows=CHUNK_ROWS, rng=None):
+    """
+    Yields training batches. Only the `batch_size` windows of the current batch are copied out
+    of the strided view; with `rng` the windows are shuffled within each chunk. A fab panel is
+    batched by iter_panel_batches instead, so that batches mix fabs.
+    """
+    if is_panel(path):
+        yield from iter_panel_batches(path, feature_columns, scaler, sequence_length, batch_size, rng)
+        return
+    for windows, targets in iter_scaled_windows(path, feature_columns, scaler, sequence_length, chunk_rows):
+        order = rng.permutation(len(windows)) if rng is not None else np.arange(len(windows))
+        for start in range(0, len(order), batch_size):
+            index = order[start:start + batch_size]
+            yield windows[index], targets[index]
+
+
+def iter_panel_batches(path, feature_columns, scaler, sequence_length, batch_size, rng=None, pool_fabs=PANEL_SHUFFLE_FABS):
+    """
+    Training batches of a fab panel. A panel is written scenario by scenario, so with `rng` the
+    fabs are read in a random order and the windows of every `pool_fabs` consecutive fabs are
+    shuffled together: batches mix fabs and scenarios instead of walking through one scenario
+    after the other. Memory stays bounded by the scaled rows of one pool. Batches run on across
+    pools, so all but the last hold `batch_size` windows, whatever the order.
+    """
+    n_fabs = len(panel_fab_rows(path))
+    fab_order = rng.permutation(n_fabs) if rng is not None else np.arange(n_fabs)
+    n_features = len(feature_columns)
+    carry_x = np.empty((0, sequence_length, n_features), dtype=np.float32)
+    carry_y = np.empty((0, n_features), dtype=np.float32)
+    for pool_start in range(0, n_fabs, pool_fabs):
+        windows, targets = [], []
+        for _, _, values in iter_panel_fabs(path, feature_columns, fab_order[pool_start:pool_start + pool_fabs]):
+            if len(values) > sequence_length:
+                scaled = scaler.transform(values).astype(np.float32)
+                windows.append(sliding_window_view(scaled[:-1], sequence_length, axis=0).transpose(0, 2, 1))
+                targets.append(scaled[sequence_length:])
+        if not windows:
+            continue
+        # (fab in pool, window in fab) of every window, in batch order
+        fab_index = np.repeat(np.arange(len(windows)), [len(w) for w in windows])
+        window_index = np.concatenate([np.arange(len(w)) for w in windows])
+        order = rng.permutation(len(fab_index)) if rng is not None else np.arange(len(fab_index))
+        position = 0
+        while position < len(order):
+            index = order[position:position + batch_size - len(carry_x)]
+            position += len(index)
+            x = np.empty((len(index), sequence_length, n_features), dtype=np.float32)
+            y = np.empty((len(index), n_features), dtype=np.float32)
+            for fab in np.unique(fab_index[index]):
+                mask = fab_index[index] == fab
+                x[mask] = windows[fab][window_index[index[mask]]]
+                y[mask] = targets[fab][window_index[index[mask]]]
+            carry_x, carry_y = np.concatenate([carry_x, x]), np.concatenate([carry_y, y])
+            if len(carry_x) == batch_size:
+                yield carry_x, carry_y
+                carry_x, carry_y = carry_x[:0], carry_y[:0]
+    if len(carry_x):
+        yield carry_x, carry_y
+
+
+def make_windows(scaled_data, sequence_length, output_horizon=1):
+    """
+    In-memory (windows, targets) for data that fits in RAM, e.g. a search trial's split.
+    windows is a strided view; targets holds the next `output_horizon` days of each window,
+    flattened to [n, output_horizon * features] to match a direct multi-horizon Dense head.
+    """
+    n_windows = len(scaled_data) - sequence_length - output_horizon + 1
+    windows = sliding_window_view(scaled_data[:-output_horizon], sequence_length, axis=0).transpose(0, 2, 1)[:n_windows]
+    targets = sliding_window_view(scaled_data[sequence_length:], output_horizon, axis=0).transpose(0, 2, 1)
+    return windows, targets.reshape(n_windows, -1)
+
+
+def scan_appended_rows(path, feature_columns, consumed_rows, chunk_rows=CHUNK_ROWS):
+    """
+    Streaming pass for incremental training: returns (rows, prefix_sha, sha), where prefix_sha
+    is the data_fingerprint of the first `consumed_rows` rows and sha that of the whole file.
+    A prefix_sha that differs from the bundle's hash means history was rewritten, not appended.
+    """
+    prefix_sha, sha = hashlib.sha256(), hashlib.sha256()
+    rows = 0
+    for values in iter_feature_chunks(path, feature_columns, chunk_rows):
+        data = np.ascontiguousarray(values)
+        prefix_sha.update(data[:max(consumed_rows - rows, 0)].tobytes())
+        sha.update(data.tobytes())
+        rows += len(values)
+    return rows, prefix_sha.hexdigest(), sha.hexdigest()
+
+
+def collect_windows(path, feature_columns, scaler, sequence_length, targets, output_horizon=1, chunk_rows=CHUNK_ROWS):
+    """
+    Copies out the windows whose first predicted row is in `targets` (sorted row indices) as
+    (x, y) arrays shaped like make_windows'. Only the selected windows are materialised, so
+    this stays cheap for a small set of targets; windows may span chunk boundaries.
+    """
+    targets = np.asarray(targets, dtype=np.int64)
+    span = sequence_length + output_horizon
+    x = np.empty((len(targets), sequence_length, len(feature_columns)), dtype=np.float32)
+    y = np.empty((len(targets), output_horizon * len(feature_columns)), dtype=np.float32)
+    carry = np.empty((0, len(feature_columns)), dtype=np.float32)
+    seen = 0
+    for values in iter_feature_chunks(path, feature_columns, chunk_rows):
+        rows = np.concatenate([carry, scaler.transform(values).astype(np.float32)])
+        first_row = seen - len(carry)  # global index of rows[0]
+        # Windows whose last predicted row arrives with this chunk
+        lo, hi = np.searchsorted(targets, [seen - output_horizon + 1, seen + len(values) - output_horizon + 1])
+        if hi > lo:
+            blocks = sliding_window_view(rows, span, axis=0).transpose(0, 2, 1)[targets[lo:hi] - sequence_length - first_row]
+            x[lo:hi] = blocks[:, :sequence_length]
+            y[lo:hi] = blocks[:, sequence_length:].reshape(hi - lo, -1)
+        seen += len(values)
+        carry = rows[-(span - 1):]
+    return x, y
+
+
+def count_batches(n_rows, sequence_length, batch_size, chunk_rows=CHUNK_ROWS):
+    """Number of batches iter_window_batches yields for a file of `n_rows` rows."""
+    batches, seen = 0, 0
+    for start in range(0, n_rows, chunk_rows):
+        chunk = min(chunk_rows, n_rows - start)
+        windows = min(seen, sequence_length) + chunk - sequence_length
+        if windows > 0:
+            batches += -(-windows // batch_size)
+        seen += chunk
+    return batches
+
+
+def make_dataset(path, feature_columns, scaler, sequence_length, batch_size, chunk_rows=CHUNK_ROWS, shuffle=True, seed=None, n_rows=None):
+    """
+    tf.data pipeline over iter_window_batches. The generator restarts (and reshuffles) every
+    epoch, and prefetching overlaps CSV reading and windowing with training. Passing `n_rows`
+    (or any value, for a fab panel) declares the number of batches, so Keras can show
+    progress and epochs end cleanly.
+    """
+    import tensorflow as tf
+
+    n_features = len(feature_columns)
+
+    def generate():
+        rng = np.random.default_rng(seed) if shuffle else None
+        yield from iter_window_batches(path, feature_columns, scaler, sequence_length, batch_size, chunk_rows, rng)
+
+    dataset = tf.data.Dataset.from_generator(
+        generate,
+        output_signature=(
+            tf.TensorSpec(shape=(None, sequence_length, n_features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None, n_features), dtype=tf.float32),
+        ),
+    )
+    if n_rows is not None:
+        if is_panel(path):
+            windows = sum(rows - sequence_length for rows in panel_fab_rows(path) if rows > sequence_length)
+            batches = -(-windows // batch_size)
+        else:
+            batches = count_batches(n_rows, sequence_length, batch_size, chunk_rows)
+        dataset = dataset.apply(tf.data.experimental.assert_cardinality(batches))
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def residual_std(model, dataset):
+    """Per-feature std of the model's one-step errors, accumulated batch by batch."""
+    count, total, total_sq = 0, 0.0, 0.0
+    for x, y in dataset:
+        residuals = model(x, training=False).numpy().astype(np.float64) - y.numpy()
+        count += len(residuals)
+        total = total + residuals.sum(axis=0)
+        total_sq = total_sq + (residuals ** 2).sum(axis=0)
+    mean = total / count
+    return np.sqrt(np.maximum(total_sq / count - mean ** 2, 0.0))
+
+
+def build_lstm_model(sequence_length, n_features, units=(50, 50), output_horizon=1, weights=None):
+    """
+    The stacked LSTM + Dense forecaster the bundles describe (not yet compiled). With
+    `output_horizon` > 1 the Dense head predicts that many days at once (direct multi-horizon).
+    `weights` in the lstm_numpy key layout warm-starts it from an existing bundle.
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Input
+
+    model = Sequential()
+    model.add(Input(shape=(sequence_length, n_features)))
+    for index, layer_units in enumerate(units):
+        model.add(LSTM(units=layer_units, return_sequences=index < len(units) - 1))
+    model.add(Dense(units=n_features * output_horizon))
+    if weights is not None:
+        ordered = []
+        for index in range(len(units)):
+            ordered += [weights[f'lstm_{index}_kernel'], weights[f'lstm_{index}_recurrent_kernel'], weights[f'lstm_{index}_bias']]
+        model.set_weights(ordered + [weights['dense_kernel'], weights['dense_bias']])
+    return model
@@ -0,0 +1,182 @@
+import json
+import os
+import re
+import threading
+from site_report import TRANSLATION_SEPARATOR, translation_prompt
+from translations import DISTRICT_MAP_EN_KN, LANG_STRINGS, REPORT_TERMS_EN_KN
+
+# --- Translation Memory ---
+# Kannada reports repeat the same headings, labels, verdict lines and many whole sentences.
+# Text to translate is cut into segments (one per sentence, heading or list item), each keyed by
+# its normalized English: surrounding Markdown emphasis and whitespace are stripped, so
+# "**Final Verdict**" and "Final Verdict:" share the entry for "Final Verdict". Known segments are
+# served from the memory; all unknown segments of the texts translated together go to the LLM in
+# one numbered, batched request, and their translations are added to the memory. The memory is seeded from the Kannada
+# strings in translations.py; the translations learned from the LLM are kept in a JSON file per
+# model and batch prompt version, so a new model or prompt starts afresh, and invalidate()
+# drops them (the admin panel's "Clear Learned Translations").
+MEMORY_PATH = 'cache/translation_memory.json'
+# Part of the key of learned translations: bump it whenever batch_prompt changes
+BATCH_TEMPLATE_VERSION = 1
+
+_LINE_PREFIX = re.compile(r'^(\s*(?:#+|[-*+]|\d+[.)])\s+)?(.*)$')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+(?=\S)')
+_EMPHASIS = re.compile(r'^([*_]+)?(.*?)([*_:]+)?$', re.DOTALL)
+_NUMBERED_LINE = re.compile(r'^\s*(\d+)[.)]\s?(.*)$')
+
+
+def normalize_segment(text):
+    return ' '.join(text.split())
+
+
+def _split_markup(segment):
+    """(prefix, core, suffix): the Markdown emphasis around a segment, when its core has none of its own."""
+    prefix, core, suffix = _EMPHASIS.match(segment).groups()
+    if not core or re.search(r'[*_]', core):
+        return '', segment, ''
+    return prefix or '', core, suffix or ''
+
+
+def _translatable(core):
+    return re.search(r'[A-Za-z]', core) is not None
+
+
+def seed_entries():
+    """English-to-Kannada pairs from translations.py: UI strings, district names and report terms."""
+    entries = {}
+    for strings in LANG_STRINGS.values():
+        english, kannada = strings.get('en'), strings.get('kn')
+        if isinstance(english, str) and isinstance(kannada, str) and '{' not in english:
+            entries[normalize_segment(english)] = kannada
+    for pairs in (DISTRICT_MAP_EN_KN, REPORT_TERMS_EN_KN):
+        entries.update({normalize_segment(english): kannada for english, kannada in pairs.items()})
+    return entries
+
+
+def batch_prompt(segments):
+    numbered = "\n".join(f"{number}. {segment}" for number, segment in enumerate(segments, start=1))
+    return ("Translate each numbered English segment below accurately into formal Kannada. Retain all Markdown "
+            f"formatting and reply with exactly one line per segment, numbered the same way, and nothing else:\n{TRANSLATION_SEPARATOR}{numbered}")
+
+
+def parse_batch(response, count):
+    """The translations of a batch_prompt response, or None if it does not have one line per segment."""
+    translations = {}
+    for line in response.strip().splitlines():
+        match = _NUMBERED_LINE.match(line)
+        if match:
+            translations[int(match.group(1))] = match.group(2).strip()
+    if sorted(translations) != list(range(1, count + 1)):
+        return None
+    return [translations[number] for number in range(1, count + 1)]
+
+
+class TranslationMemory:
+    def __init__(self, path=MEMORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.seeds = seed_entries()
+        # {"<model>:v<batch template version>": {english key: kannada}}
+        self.learned = {}
+        if path:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    # Anything that is not a namespace of learned entries predates them and is dropped
+                    self.learned = {namespace: entries for namespace, entries in json.load(f).items() if isinstance(entries, dict)}
+            except (FileNotFoundError, ValueError):
+                pass
+        self.stats = {'segments': 0, 'memory_hits': 0, 'llm_segments': 0, 'llm_requests': 0, 'fallbacks': 0}
+
+    @staticmethod
+    def namespace(model_name):
+        return f'{model_name}:v{BATCH_TEMPLATE_VERSION}'
+
+    def _lookup(self, key, model_name):
+        learned = self.learned.get(self.namespace(model_name), {})
+        return self.seeds.get(key, learned.get(key))
+
+    def plan(self, text, model_name):
+        """
+        Segments `text` and returns (lines, unknown): lines as [(line prefix, [(prefix, key, suffix)])]
+        and the distinct keys the memory does not know for `model_name` yet, in order of appearance.
+        """
+        lines, unknown = [], []
+        for line in text.split('\n'):
+            line_prefix, body = _LINE_PREFIX.match(line).groups()
+            segments = []
+            for sentence in _SENTENCE_BREAK.split(body) if body.strip() else []:
+                prefix, core, suffix = _split_markup(sentence)
+                key = normalize_segment(core)
+                segments.append((prefix, key, suffix))
+                if _translatable(key) and self._lookup(key, model_name) is None and key not in unknown:
+                    unknown.append(key)
+            lines.append((line_prefix or '', segments))
+        return lines, unknown
+
+    def complete(self, lines, unknown, model_name, translations=()):
+        """Assembles the Kannada text of a plan once `translations` of its unknown keys are known."""
+        return '\n'.join(self._complete_lines(lines, unknown, model_name, translations))
+
+    def _complete_lines(self, lines, unknown, model_name, translations):
+        with self._lock:
+            if unknown:
+                self.learned.setdefault(self.namespace(model_name), {}).update(zip(unknown, translations))
+            segments = [segment for _, line_segments in lines for segment in line_segments]
+            # Numbers and bare markup are copied through, so only translatable segments count
+            translatable = [key for _, key, _ in segments if _translatable(key)]
+            self.stats['segments'] += len(translatable)
+            self.stats['memory_hits'] += sum(1 for key in translatable if key not in unknown)
+            if unknown:
+                self.stats['llm_segments'] += len(unknown)
+                self.stats['llm_requests'] += 1
+                self._save()
+            return [
+                line_prefix + ' '.join(prefix + (self._lookup(key, model_name) or key) + suffix for prefix, key, suffix in segments)
+                for line_prefix, segments in lines
+            ]
+
+    def translate(self, backend, texts):
+        """
+        Kannada for each of `texts`, asking `backend` only for the segments the memory does not
+        know, for all the texts in one request.
+        """
+        lines, unknown = self.plan('\n'.join(texts), backend.model_name)
+        translations = ()
+        if unknown:
+            translations = parse_batch(backend.generate(batch_prompt(unknown)), len(unknown))
+            if translations is None:
+                # The reply lost the numbering: translate each text as a whole and learn nothing from it
+                with self._lock:
+                    self.stats['fallbacks'] += 1
+                return [backend.generate(translation_prompt(text)).strip() for text in texts]
+        # Every line of the joined texts gives one line of Kannada, so the texts split back by line count
+        translated = self._complete_lines(lines, unknown, backend.model_name, translations)
+        results = []
+        for text in texts:
+            count = text.count('\n') + 1
+            results.append('\n'.join(translated[:count]))
+            translated = translated[count:]
+        return results
+
+    def invalidate(self, model_name=None):
+        """Drops the learned translations (of `model_name` only, if given); returns the count removed."""
+        with self._lock:
+            namespaces = [namespace for namespace in self.learned
+                          if model_name is None or namespace.rsplit(':v', 1)[0] == model_name]
+            removed = sum(len(self.learned.pop(namespace)) for namespace in namespaces)
+            self._save()
+        return removed
+
+    def summary(self):
+        """Learned entries per model and batch template version, for the admin panel."""
+        with self._lock:
+            return {namespace: len(entries) for namespace, entries in self.learned.items()}
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.learned, f, ensure_ascii=False, indent=0)
+        os.replace(tmp_path, self.path)
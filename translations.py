@@ -59,6 +59,18 @@ LANG_STRINGS = {
     'pdf_report_title': { # Note: Re-using this key for the HTML title
         'en': "Semiconductor Fab Site Feasibility Report",
         'kn': "ಸೆಮಿಕಂಡಕ್ಟರ್ ಫ್ಯಾಬ್ ಸೈಟ್ ಕಾರ್ಯಸಾಧ್ಯತಾ ವರದಿ"
+    },
+    'ranking_header': {
+        'en': "District Ranking",
+        'kn': "ಜಿಲ್ಲೆಗಳ ಶ್ರೇಯಾಂಕ"
+    },
+    'ranking_info': {
+        'en': "All districts scored against the benchmarks. Adjust the weights to change the ranking.",
+        'kn': "ಎಲ್ಲಾ ಜಿಲ್ಲೆಗಳನ್ನು ಮಾನದಂಡಗಳ ಆಧಾರದ ಮೇಲೆ ಅಂಕಗೊಳಿಸಲಾಗಿದೆ. ಶ್ರೇಯಾಂಕವನ್ನು ಬದಲಾಯಿಸಲು ತೂಕಗಳನ್ನು ಹೊಂದಿಸಿ."
+    },
+    'weight_labels': {
+        'en': {'water': "Water weight", 'industry': "Industry weight", 'logistics': "Logistics weight"},
+        'kn': {'water': "ನೀರಿನ ತೂಕ", 'industry': "ಕೈಗಾರಿಕೆ ತೂಕ", 'logistics': "ಸಾರಿಗೆ ತೂಕ"}
     }
 }
 
@@ -67,5 +79,13 @@ DISTRICT_MAP_EN_KN = {
     'Bagalkote': 'ಬಾಗಲಕೋಟೆ', 'Bangalore Rural': 'ಬೆಂಗಳೂರು ಗ್ರಾಮಾಂತರ', 'Bangalore Urban': 'ಬೆಂಗಳೂರು ನಗರ', 'Belagavi': 'ಬೆಳಗಾವಿ', 'Bellary': 'ಬಳ್ಳಾರಿ', 'Bidar': 'ಬೀದರ್', 'Chamarajanagar': 'ಚಾಮರಾಜನಗರ', 'Chikkaballapur': 'ಚಿಕ್ಕಬಳ್ಳಾಪುರ', 'Chikkamagaluru': 'ಚಿಕ್ಕಮಗಳೂರು', 'Chitradurga': 'ಚಿತ್ರದುರ್ಗ', 'Dakshina Kannada': 'ದಕ್ಷಿಣ ಕನ್ನಡ', 'Davanagere': 'ದಾವಣಗೆರೆ', 'Dharwad': 'ಧಾರವಾಡ', 'Gadag': 'ಗದಗ', 'Hassan': 'ಹಾಸನ', 'Haveri': 'ಹಾವೇರಿ', 'Kalaburagi': 'ಕಲಬುರಗಿ', 'Kodagu': 'ಕೊಡಗು', 'Kolar': 'ಕೋಲಾರ', 'Koppal': 'ಕೊಪ್ಪಳ', 'Mandya': 'ಮಂಡ್ಯ', 'Mysuru': 'ಮೈಸೂರು', 'Raichur': 'ರಾಯಚೂರು', 'Ramanagara': 'ರಾಮನಗರ', 'Shivamogga': 'ಶಿವಮೊಗ್ಗ', 'Tumakuru': 'ತುಮಕೂರು', 'Udupi': 'ಉಡುಪಿ', 'Uttara Kannada': 'ಉತ್ತರ ಕನ್ನಡ', 'Vijayapura': 'ವಿಜಯಪುರ', 'Yadgir': 'ಯಾದಗಿರಿ'
 }
 
+# Fixed terms of the generated reports, used to seed the translation memory
+REPORT_TERMS_EN_KN = {
+    'Final Verdict': 'ಅಂತಿಮ ತೀರ್ಪು', 'Suitable': 'ಸೂಕ್ತ', 'Not Suitable': 'ಸೂಕ್ತವಲ್ಲ',
+    'Strength': 'ಸಾಮರ್ಥ್ಯ', 'Weakness': 'ದೌರ್ಬಲ್ಯ', 'Neutral': 'ತಟಸ್ಥ', 'Not Available': 'ಲಭ್ಯವಿಲ್ಲ',
+    'Parameter Significance': 'ನಿಯತಾಂಕಗಳ ಮಹತ್ವ', 'Data-Driven Analysis': 'ಡೇಟಾ-ಆಧಾರಿತ ವಿಶ್ಲೇಷಣೆ', 'Synthesis & Conclusion': 'ಸಂಶ್ಲೇಷಣೆ ಮತ್ತು ತೀರ್ಮಾನ',
+    'Water Security': 'ನೀರಿನ ಭದ್ರತೆ', 'Industrial Ecosystem': 'ಕೈಗಾರಿಕಾ ಪರಿಸರ ವ್ಯವಸ್ಥೆ', 'Logistics Infrastructure': 'ಸಾರಿಗೆ ಮೂಲಸೌಕರ್ಯ'
+}
+
 # Create a reverse mapping from Kannada to English for easy lookup
 DISTRICT_MAP_KN_EN = {v: k for k, v in DISTRICT_MAP_EN_KN.items()}
\ No newline at end of file